@@ -89,6 +89,17 @@ class AccountCommentListItemSerializer(serializers.Serializer):
 # --------------------------
 # Personal Info
 # --------------------------
+class AccountMeSerializer(serializers.Serializer):
+    """
+    로그인 사용자 정보 (accounts/me, 메인 화면 묶음 조회에서 같이 사용)
+    """
+    id = serializers.IntegerField()
+    username = serializers.CharField()
+    nickname = serializers.CharField(allow_null=True)
+    email = serializers.CharField(allow_blank=True)
+    is_coldstart_completed = serializers.BooleanField()
+    profile_image = serializers.CharField(allow_null=True)
+
 class NicknameUpdateSerializer(serializers.Serializer):
     nickname = serializers.CharField()
 
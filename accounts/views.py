@@ -18,7 +18,8 @@ from .serializers import (
     ColdStartBooksSerializer,
     ColdStartProfileInfoRequestSerializer,
     AccountCommentListItemSerializer,
-    NicknameUpdateSerializer
+    NicknameUpdateSerializer,
+    AccountMeSerializer,
 )
 
 User = get_user_model()
@@ -34,7 +35,8 @@ from .serializers import (
 
 from api.models import (
     Tag, Book, Highlight, UserBookHistory,
-    Library, Wishlist, UserBookLike
+    Library, Wishlist, UserBookLike,
+    COMMENT_PRESENT,
 )
 from .models import Trait
 
@@ -343,9 +345,7 @@ def comment_list(request):
     qs = (
         UserBookHistory.objects
         .select_related("book")
-        .filter(user=user)
-        .exclude(comment__isnull=True)
-        .exclude(comment__exact="")
+        .filter(COMMENT_PRESENT, user=user)  # ubh_user_comment_idx (부분 인덱스)
         .order_by("-updated_at")
     )
 
@@ -644,16 +644,8 @@ def account_me(request):
     """
     현재 로그인된 사용자 정보 조회
     """
-    user = request.user
     return Response({
-        "user": {
-            "id": user.id,
-            "username": user.username,
-            "nickname": user.nickname,
-            "email": user.email,
-            "is_coldstart_completed": user.is_coldstart_completed,
-            "profile_image": user.profile_image,
-        }
+        "user": AccountMeSerializer(request.user).data,
     }, status=status.HTTP_200_OK)
 
 @api_view(["POST"])
@@ -6,10 +6,81 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
+import hashlib
+import zipfile
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
 from django.db import transaction
 
 from .admin_serializers import AdminBookCreateSerializer
 from .models import Book, GenreChild, Author, AuthorsBook
+from .ingestion import enqueue_ingestion
+from . import text_store
+
+# 커버 이미지로 허용하는 포맷의 파일 시그니처 (JPEG, PNG, GIF, WebP)
+IMAGE_SIGNATURES = (b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n", b"GIF87a", b"GIF89a", b"RIFF")
+
+
+class UploadGuardHandler(FileUploadHandler):
+    """
+    multipart 업로드를 받는 도중(청크 단위)에 동작하는 핸들러.
+    - 필드별 최대 크기를 넘으면 그 파일은 더 이상 저장하지 않고 버림(SkipFile)
+    - 받으면서 sha256을 계산 (저장 후 다시 읽지 않음)
+    실제 저장(메모리/임시파일)은 뒤에 있는 기본 핸들러들이 담당한다.
+    """
+
+    def __init__(self, limits: dict, request=None):
+        super().__init__(request)
+        self.limits = limits
+        self.oversized = set()
+        self.checksums = {}
+        self._digest = None
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self._digest = hashlib.sha256() if field_name in self.limits else None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self._digest is not None:
+            if start + len(raw_data) > self.limits[self.field_name]:
+                self.oversized.add(self.field_name)
+                self._digest = None
+                raise SkipFile()
+            self._digest.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self._digest is not None:
+            self.checksums[self.field_name] = self._digest.hexdigest()
+        return None
+
+
+def _is_valid_epub(upload) -> bool:
+    """
+    EPUB(OCF) 최소 구조 확인: zip + mimetype=application/epub+zip + META-INF/container.xml
+    (zip 중앙 디렉터리만 읽으므로 파일 전체를 메모리에 올리지 않음)
+    """
+    try:
+        upload.seek(0)
+        with zipfile.ZipFile(upload) as zf:
+            names = set(zf.namelist())
+            if "mimetype" not in names or "META-INF/container.xml" not in names:
+                return False
+            return zf.read("mimetype").strip() == b"application/epub+zip"
+    except (zipfile.BadZipFile, OSError):
+        return False
+    finally:
+        upload.seek(0)
+
+
+def _is_valid_image(upload) -> bool:
+    upload.seek(0)
+    head = upload.read(12)
+    upload.seek(0)
+    if head.startswith(b"RIFF"):
+        return head[8:12] == b"WEBP"
+    return head.startswith(IMAGE_SIGNATURES)
 
 
 @api_view(["POST"])
@@ -18,12 +89,22 @@ from .models import Book, GenreChild, Author, AuthorsBook
 def admin_book_create(request):
     import json
     from django.core.files.storage import default_storage
-    from django.core.files.base import ContentFile
-    from django.conf import settings
+
+    epub_checksum = ""
 
     # 1. Handle Multipart/Form-Data vs JSON
     # If content-type is multipart/form-data, we expect 'data' (json) and files ('cover_image', 'epub_file')
     if request.content_type.startswith('multipart/form-data'):
+        # request.data를 처음 읽기 전에 등록해야 업로드 스트림에 적용됨
+        guard = UploadGuardHandler(
+            {
+                "cover_image": settings.COVER_UPLOAD_MAX_BYTES,
+                "epub_file": settings.EPUB_UPLOAD_MAX_BYTES,
+            },
+            request._request,
+        )
+        request.upload_handlers.insert(0, guard)
+
         try:
             # Parse JSON data
             raw_data = request.data.get('data')
@@ -38,18 +119,40 @@ def admin_book_create(request):
             else:
                 data = raw_data # In case DRF parsed it already?
 
+            # 크기 초과 / 형식 오류는 저장 전에 거절
+            if guard.oversized:
+                return Response(
+                    {
+                        "message": "업로드 파일이 허용 크기를 초과했습니다.",
+                        "error": {"code": "FILE_TOO_LARGE", "fields": sorted(guard.oversized)},
+                    },
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                )
+            if 'cover_image' in request.FILES and not _is_valid_image(request.FILES['cover_image']):
+                return Response(
+                    {"message": "커버 이미지 형식이 올바르지 않습니다.", "error": {"code": "INVALID_COVER_IMAGE"}},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if 'epub_file' in request.FILES and not _is_valid_epub(request.FILES['epub_file']):
+                return Response(
+                    {"message": "EPUB 파일 형식이 올바르지 않습니다.", "error": {"code": "INVALID_EPUB"}},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
             # Handle File Uploads
+            # 업로드 객체를 그대로 넘기면 storage가 청크 단위로 복사(큰 파일은 임시파일 이동)
             if 'cover_image' in request.FILES:
                 cover_file = request.FILES['cover_image']
                 # Save file
-                path = default_storage.save(f"covers/{cover_file.name}", ContentFile(cover_file.read()))
+                path = default_storage.save(f"covers/{cover_file.name}", cover_file)
                 # Generate full URL
                 data['cover_image'] = request.build_absolute_uri(settings.MEDIA_URL + path)
             
             if 'epub_file' in request.FILES:
                 epub = request.FILES['epub_file']
-                path = default_storage.save(f"epubs/{epub.name}", ContentFile(epub.read()))
+                path = default_storage.save(f"epubs/{epub.name}", epub)
                 data['epub_file'] = request.build_absolute_uri(settings.MEDIA_URL + path)
+                epub_checksum = guard.checksums.get('epub_file', "")
 
         except json.JSONDecodeError:
              return Response(
@@ -118,6 +221,7 @@ def admin_book_create(request):
 
             cover_image=data["cover_image"],
             epub_file=data["epub_file"],
+            epub_checksum=epub_checksum,
 
             abstract_descript=data.get("abstract_descript"),
             full_descript=data.get("full_descript"),
@@ -139,6 +243,9 @@ def admin_book_create(request):
                 is_primary=c["is_primary"],
             )
 
+        # 3) EPUB 후처리(본문 추출/챕터 맵 등)는 ingest_books 워커에게 맡김
+        ingest_task = enqueue_ingestion(book)
+
     return Response(
         {
             "message": "도서가 등록되었습니다.",
@@ -150,6 +257,7 @@ def admin_book_create(request):
                 "genre": str(book.genre),
                 "toc_count": len(book.toc),
                 "contributors_count": len(data["contributors"]),
+                "ingest_task_id": str(ingest_task.id),
             },
         },
         status=status.HTTP_201_CREATED,
@@ -191,4 +299,19 @@ def admin_author_list(request):
                 "author": serializer.data
             },
             status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+@authentication_classes([JWTAuthentication])
+def admin_cache_stats(request):
+    """
+    요청을 처리한 워커(프로세스)의 인메모리 캐시 통계 (워커별 캐시 크기 조정용)
+    """
+    return Response(
+        {
+            "epub_text_cache": text_store.epub_text_cache.stats(),
+        },
+        status=status.HTTP_200_OK,
+    )
@@ -0,0 +1,255 @@
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Author, AuthorsBook, Book, Tag
+from .search import compact_text, to_chosung
+
+logger = logging.getLogger(__name__)
+
+# 도서 가중치 = like_count * LIKE_WEIGHT + readed_num_week * READ_WEIGHT
+LIKE_WEIGHT = 1
+READ_WEIGHT = 2
+
+# 짧은 prefix는 매칭 범위가 넓어서 top-k 결과를 따로 캐시
+SHORT_PREFIX_LEN = 2
+# 짧은 prefix 캐시 항목 수 상한 (limit 값 조합까지 키에 들어가므로 넘치면 비움)
+SHORT_CACHE_LIMIT = 10_000
+
+_PREFIX_END = "\U0010ffff"
+
+
+def book_weight(like_count, readed_num_week) -> int:
+    return (like_count or 0) * LIKE_WEIGHT + (readed_num_week or 0) * READ_WEIGHT
+
+
+def _suggest_keys(text) -> set[str]:
+    """
+    한 항목이 걸리는 prefix 키들
+    - 전체 문자열, 두 번째 단어부터 시작하는 나머지 ("해리 포터" -> "해리포터", "포터")
+    - 초성 ("ㅎㄹㅍㅌ")
+    """
+    words = str(text or "").split()
+    keys = {compact_text(" ".join(words[i:])) for i in range(len(words))}
+    keys.add(to_chosung(text))
+    keys.discard("")
+    return keys
+
+
+class AutocompleteIndex:
+    """
+    제목 / 작가 이름 / 태그 이름 자동완성용 프로세스 내 prefix 인덱스.
+
+    - 정렬된 (key, entry_key) 배열에서 bisect로 prefix 범위를 찾고 weight 상위 k개 반환
+    - 첫 요청 때 DB에서 전체 생성, 이후 signals에서 바뀐 항목만 갱신 (refresh_*)
+    - 다른 프로세스에서 바뀐 내용/좋아요·조회 수 변화는 AUTOCOMPLETE_REBUILD_SECONDS마다 전체 재생성으로 반영
+      재생성은 백그라운드 스레드 하나가 하고, 그동안 요청은 이전 인덱스로 바로 응답 (끝나면 통째로 교체)
+    """
+
+    def __init__(self, rebuild_seconds: int):
+        self.rebuild_seconds = rebuild_seconds
+        self._lock = threading.Lock()
+        self._keys: list[tuple[str, tuple]] = []
+        self._entries: dict[tuple, dict] = {}
+        self._short_cache: dict[tuple, list] = {}
+        self._built_at = None
+        self._rebuilding = False
+        # 백그라운드 재생성 중에 signals로 갱신된 항목 -> 교체 후 다시 반영 (재생성이 먼저 읽은 DB 값으로 덮이지 않도록)
+        self._refreshed_while_rebuilding: list[tuple[str, set]] = []
+
+    # ---------- 조회 ----------
+    def suggest(self, query: str, limit: int) -> list[dict]:
+        self._ensure_built()
+
+        prefix = compact_text(query)
+        if not prefix:
+            return []
+
+        cache_key = (prefix, limit)
+        if len(prefix) <= SHORT_PREFIX_LEN:
+            cached = self._short_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        keys, entries = self._keys, self._entries
+        lo = bisect_left(keys, (prefix,))
+        hi = bisect_left(keys, (prefix + _PREFIX_END,), lo)
+        # 같은 항목이 여러 키로 걸릴 수 있어서 entry_key로 중복 제거
+        matched = {keys[i][1] for i in range(lo, hi)}
+        top = heapq.nlargest(limit, (entries[k] for k in matched if k in entries), key=lambda e: e["weight"])
+        result = [{k: v for k, v in e.items() if k != "weight"} for e in top]
+
+        if len(prefix) <= SHORT_PREFIX_LEN:
+            if len(self._short_cache) >= SHORT_CACHE_LIMIT:
+                self._short_cache = {}
+            self._short_cache[cache_key] = result
+        return result
+
+    # ---------- 생성 / 갱신 ----------
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._built_at >= self.rebuild_seconds
+
+    def _ensure_built(self):
+        if self._built_at is None:
+            # 돌려줄 인덱스가 아직 없으므로 첫 생성만 요청 안에서 (동시에 온 요청은 기다림)
+            with self._lock:
+                if self._built_at is None:
+                    self._swap(*self._build())
+            return
+
+        if self._rebuilding or not self._is_stale():
+            return
+        with self._lock:
+            if self._rebuilding or not self._is_stale():
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_in_background, name="autocomplete-rebuild", daemon=True).start()
+
+    def _rebuild_in_background(self):
+        try:
+            keys, entries = self._build()
+        except Exception:
+            logger.exception("autocomplete rebuild failed")
+            keys = entries = None
+        finally:
+            # 풀 밖 스레드라 DB 연결이 자동으로 정리되지 않음
+            connection.close()
+
+        with self._lock:
+            if keys is not None:
+                self._swap(keys, entries)
+            else:
+                self._built_at = time.monotonic()  # 실패해도 이전 인덱스로 한 주기 더 응답
+            self._rebuilding = False
+            replay, self._refreshed_while_rebuilding = self._refreshed_while_rebuilding, []
+
+        try:
+            for kind, ids in replay:
+                self._refresh(kind, ids)
+        finally:
+            connection.close()
+
+    def rebuild(self):
+        """전체 재생성 (요청 안에서 바로)"""
+        keys, entries = self._build()
+        with self._lock:
+            self._swap(keys, entries)
+
+    def _build(self):
+        entries = {}
+        for entry in self._book_entries():
+            entries[entry["_key"]] = entry
+        for entry in self._author_entries():
+            entries[entry["_key"]] = entry
+        for entry in self._tag_entries():
+            entries[entry["_key"]] = entry
+
+        keys = sorted(
+            (key, entry_key)
+            for entry_key, entry in entries.items()
+            for key in _suggest_keys(entry["text"])
+        )
+        for entry in entries.values():
+            del entry["_key"]
+        return keys, entries
+
+    def _swap(self, keys, entries):
+        # 배열/딕셔너리를 통째로 교체 (조회 중인 요청은 이전 배열을 그대로 봄). _lock 안에서 호출
+        self._keys, self._entries, self._short_cache = keys, entries, {}
+        self._built_at = time.monotonic()
+
+    def _replace(self, kind: str, ids, new_entries):
+        if self._built_at is None:
+            return  # 아직 생성 전이면 첫 조회 때 전체 생성
+        ids = set(ids)
+        with self._lock:
+            if self._rebuilding:
+                self._refreshed_while_rebuilding.append((kind, ids))
+            entries = {
+                k: v for k, v in self._entries.items()
+                if not (k[0] == kind and k[1] in ids)
+            }
+            keys = [item for item in self._keys if not (item[1][0] == kind and item[1][1] in ids)]
+            for entry in new_entries:
+                entry_key = entry.pop("_key")
+                entries[entry_key] = entry
+                for key in _suggest_keys(entry["text"]):
+                    insort(keys, (key, entry_key))
+            self._keys, self._entries, self._short_cache = keys, entries, {}
+
+    def _refresh(self, kind: str, ids):
+        loader = {"book": self._book_entries, "author": self._author_entries, "tag": self._tag_entries}[kind]
+        self._replace(kind, ids, list(loader(ids)))
+
+    def refresh_books(self, isbns):
+        self._refresh("book", isbns)
+
+    def refresh_authors(self, author_ids):
+        self._refresh("author", author_ids)
+
+    def refresh_tags(self, tag_ids):
+        self._refresh("tag", tag_ids)
+
+    # ---------- DB -> 항목 ----------
+    @staticmethod
+    def _book_entries(isbns=None):
+        qs = Book.objects.all()
+        if isbns is not None:
+            qs = qs.filter(isbn__in=isbns)
+        for isbn, title, cover_image, like_count, readed_num_week in qs.values_list(
+            "isbn", "title", "cover_image", "like_count", "readed_num_week"
+        ):
+            yield {
+                "_key": ("book", isbn),
+                "type": "book",
+                "text": title,
+                "isbn": isbn,
+                "cover_image": cover_image,
+                "weight": book_weight(like_count, readed_num_week),
+            }
+
+    @staticmethod
+    def _author_entries(author_ids=None):
+        # 작가 가중치 = 참여한 도서 가중치 합
+        authors = Author.objects.all()
+        links = AuthorsBook.objects.all()
+        if author_ids is not None:
+            authors = authors.filter(id__in=author_ids)
+            links = links.filter(author_id__in=author_ids)
+
+        weights = {}
+        for author_id, like_count, readed_num_week in links.values_list(
+            "author_id", "book__like_count", "book__readed_num_week"
+        ):
+            weights[author_id] = weights.get(author_id, 0) + book_weight(like_count, readed_num_week)
+
+        for author_id, name in authors.values_list("id", "name"):
+            yield {
+                "_key": ("author", author_id),
+                "type": "author",
+                "text": name,
+                "author_id": author_id,
+                "weight": weights.get(author_id, 0),
+            }
+
+    @staticmethod
+    def _tag_entries(tag_ids=None):
+        qs = Tag.objects.filter(status="ACTIVE")
+        if tag_ids is not None:
+            qs = qs.filter(id__in=tag_ids)
+        for tag_id, name, global_count in qs.values_list("id", "name", "global_count"):
+            yield {
+                "_key": ("tag", tag_id),
+                "type": "tag",
+                "text": name,
+                "tag_id": tag_id,
+                "weight": global_count,
+            }
+
+
+autocomplete_index = AutocompleteIndex(settings.AUTOCOMPLETE_REBUILD_SECONDS)
@@ -0,0 +1,195 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from .models import Book, BookReadDaily, PopularSnapshot, UserBookHistory
+from .popular import write_popular_snapshot
+from .trending import trending_add, trending_increment
+
+STEADY_MIN_90D = 20  # 서비스 규모에 맞게 조절
+BULK_UPDATE_BATCH = 1000
+
+# 집계 필드 -> 그 필드로 정렬/필터하는 인기 목록
+STAT_SNAPSHOTS = {
+    "readed_num_week": [PopularSnapshot.Kind.WEEKLY],
+    "readed_num_month": [PopularSnapshot.Kind.MONTHLY, PopularSnapshot.Kind.STEADY],
+    "is_steady": [PopularSnapshot.Kind.STEADY],
+}
+STAT_FIELDS = tuple(STAT_SNAPSHOTS)
+
+# 일별 버킷 보관 기간 (가장 긴 집계 구간 = 90일)
+READ_DAILY_RETENTION_DAYS = 90
+
+
+def record_daily_read(history: UserBookHistory, now) -> bool:
+    """
+    bookview_progress에서 호출: 이 사용자가 오늘 이 책을 처음 읽은 경우에만
+    오늘 버킷(BookReadDaily)과 Book의 주간/월간 수치를 1 올림.
+    "오늘 처음"은 last_counted_on이 오늘 이전인 행만 오늘로 바꾸는 조건부 UPDATE로 판정 (동시 요청에도 1회)
+    """
+    today = timezone.localdate(now)
+
+    with transaction.atomic():
+        first_today = (
+            UserBookHistory.objects
+            .filter(pk=history.pk)
+            .filter(Q(last_counted_on__isnull=True) | Q(last_counted_on__lt=today))
+            .update(last_counted_on=today)
+        )
+        if not first_today:
+            return False
+
+        bucket = BookReadDaily.objects.filter(book_id=history.book_id, day=today)
+        if not bucket.update(count=F("count") + 1):
+            try:
+                with transaction.atomic():
+                    BookReadDaily.objects.create(book_id=history.book_id, day=today, count=1)
+            except IntegrityError:
+                bucket.update(count=F("count") + 1)
+
+        # 윈도우에 새 날이 더해지는 것은 바로 반영, 지난 날이 빠지는 것은 update_book_stats가 맞춤
+        Book.objects.filter(isbn=history.book_id).update(
+            readed_num_week=F("readed_num_week") + 1,
+            readed_num_month=F("readed_num_month") + 1,
+            trending_score=trending_add("read", now),
+        )
+    return True
+
+
+def record_daily_reads(reads, now) -> int:
+    """
+    여러 날짜/도서의 첫 읽기를 한 번에 반영 (오프라인 일괄 동기화).
+    reads: (isbn, 읽은 시각) 목록, 사용자-도서-날짜당 1건만 넘길 것 (record_daily_read와 같은 기준)
+    - 버킷은 없으면 만들고(충돌 무시) bulk_update 한 번으로 증가
+    - Book 주간/월간 수치는 해당 날짜가 구간 안일 때만 더함, 트렌딩 점수는 읽은 시각 기준
+    - 보관 기간(90일)이 지난 날은 무시
+    반영한 건수 반환
+    """
+    today = timezone.localdate(now)
+    per_bucket = Counter()
+    per_book = {}
+    for isbn, read_at in reads:
+        day = timezone.localdate(read_at)
+        if day <= today - timedelta(days=READ_DAILY_RETENTION_DAYS):
+            continue
+        per_bucket[(isbn, day)] += 1
+        week, month, score = per_book.get(isbn, (0, 0, 0.0))
+        per_book[isbn] = (
+            week + (day > today - timedelta(days=7)),
+            month + (day > today - timedelta(days=30)),
+            score + trending_increment("read", min(read_at, now)),
+        )
+    if not per_bucket:
+        return 0
+
+    with transaction.atomic():
+        BookReadDaily.objects.bulk_create(
+            [BookReadDaily(book_id=isbn, day=day, count=0) for isbn, day in per_bucket],
+            ignore_conflicts=True,
+        )
+        buckets = [
+            bucket
+            for bucket in (
+                BookReadDaily.objects
+                .filter(book_id__in=per_book, day__in={day for _, day in per_bucket})
+                .only("id", "book_id", "day")
+            )
+            if (bucket.book_id, bucket.day) in per_bucket
+        ]
+        for bucket in buckets:
+            bucket.count = F("count") + per_bucket[(bucket.book_id, bucket.day)]
+        BookReadDaily.objects.bulk_update(buckets, ["count"], batch_size=BULK_UPDATE_BATCH)
+
+        books = [
+            Book(
+                isbn=isbn,
+                readed_num_week=F("readed_num_week") + week,
+                readed_num_month=F("readed_num_month") + month,
+                trending_score=F("trending_score") + score,
+            )
+            for isbn, (week, month, score) in per_book.items()
+        ]
+        Book.objects.bulk_update(
+            books, ["readed_num_week", "readed_num_month", "trending_score"], batch_size=BULK_UPDATE_BATCH
+        )
+    return sum(per_bucket.values())
+
+
+def _recent_buckets(today):
+    return BookReadDaily.objects.filter(day__gt=today - timedelta(days=READ_DAILY_RETENTION_DAYS))
+
+
+def compute_read_counts(now) -> dict[str, tuple[int, int, int]]:
+    """
+    일별 버킷(최대 도서 수 x 90행)을 합산해서 도서별 (7일, 30일, 90일) 읽은 수 계산 (오늘 포함)
+    """
+    today = timezone.localdate(now)
+    rows = (
+        _recent_buckets(today)
+        .values("book_id")
+        .annotate(
+            week=Sum("count", filter=Q(day__gt=today - timedelta(days=7))),
+            month=Sum("count", filter=Q(day__gt=today - timedelta(days=30))),
+            quarter=Sum("count"),
+        )
+    )
+    return {r["book_id"]: (r["week"] or 0, r["month"] or 0, r["quarter"] or 0) for r in rows}
+
+
+def update_book_stats(fields=STAT_FIELDS, now=None) -> int:
+    """
+    readed_num_week / readed_num_month / is_steady를 일별 버킷 합으로 맞추고 해당 인기 목록 스냅샷 재생성.
+    - 읽을 때마다 더해지는 실시간 수치에서 구간을 벗어난 날을 빼는 역할 (몇 분 간격으로 돌려도 됨)
+    - 값이 실제로 바뀌는 도서만 bulk_update (전체 0 초기화 없음)
+    - 한 트랜잭션이라 갱신 도중 다른 요청에 0으로 초기화된 순위가 보이지 않음
+    바뀐 도서 수 반환
+    """
+    fields = [f for f in STAT_FIELDS if f in fields]
+    if not fields:
+        return 0
+
+    now = now or timezone.now()
+
+    # 최근 90일에 읽힌 도서 + 지금 값이 0/False가 아닌 도서만 보면 됨 (나머지는 그대로 0)
+    candidates = Q(isbn__in=_recent_buckets(timezone.localdate(now)).values("book_id"))
+    for field in fields:
+        candidates |= Q(is_steady=True) if field == "is_steady" else Q(**{f"{field}__gt": 0})
+
+    with transaction.atomic():
+        counts = compute_read_counts(now)
+        books = (
+            Book.objects
+            .filter(candidates)
+            .only("isbn", *fields)
+            .select_for_update()
+        )
+
+        changed = []
+        for book in books:
+            week, month, quarter = counts.get(book.isbn, (0, 0, 0))
+            new_values = {
+                "readed_num_week": week,
+                "readed_num_month": month,
+                "is_steady": quarter >= STEADY_MIN_90D,
+            }
+            if any(getattr(book, f) != new_values[f] for f in fields):
+                for f in fields:
+                    setattr(book, f, new_values[f])
+                changed.append(book)
+
+        Book.objects.bulk_update(changed, fields, batch_size=BULK_UPDATE_BATCH)
+
+        # 90일이 지난 버킷 정리
+        BookReadDaily.objects.filter(
+            day__lte=timezone.localdate(now) - timedelta(days=READ_DAILY_RETENTION_DAYS)
+        ).delete()
+
+        kinds = {kind for f in fields for kind in STAT_SNAPSHOTS[f]}
+        for kind in PopularSnapshot.Kind:
+            if kind in kinds:
+                write_popular_snapshot(kind)
+
+    return len(changed)
@@ -0,0 +1,81 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import UserBookHistory
+
+BOOK_DETAIL_CACHE_TIMEOUT = 60 * 10
+SEARCH_CACHE_TIMEOUT = 60 * 5
+# 메인 화면 묶음 조회의 인기 목록 (trending은 계속 바뀌므로 짧게)
+HOME_POPULAR_CACHE_TIMEOUT = 60
+# 스냅샷이 아직 없을 때(첫 배치 전, 무효화 직후) 지금 집계 필드로 만든 인기 목록
+POPULAR_ITEMS_CACHE_TIMEOUT = 60 * 5
+
+SEARCH_GENERATION_KEY = "books_search:generation"
+
+
+def book_detail_cache_key(isbn: str) -> str:
+    return f"book_detail:{isbn}"
+
+
+def invalidate_book_detail(*isbns):
+    """
+    book_detail 캐시 삭제. 트랜잭션 안이면 커밋 후에 지움
+    (커밋 전에 지우면 다른 요청이 이전 값을 다시 캐시할 수 있음)
+    """
+    keys = [book_detail_cache_key(isbn) for isbn in isbns]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_book_detail_for_commenter(user):
+    """
+    닉네임/프로필 이미지 변경 시 (api.signals.user_changed): 이 사용자가 코멘트를 남긴 책들의 상세 캐시 삭제
+    """
+    isbns = (
+        UserBookHistory.objects
+        .filter(user=user, comment__isnull=False)
+        .exclude(comment__exact="")
+        .values_list("book_id", flat=True)
+    )
+    invalidate_book_detail(*isbns)
+
+
+def home_popular_cache_key(kind: str) -> str:
+    return f"home:popular:{kind}"
+
+
+def popular_items_cache_key(kind: str) -> str:
+    return f"popular:items:{kind}"
+
+
+def normalize_search_query(query: str) -> str:
+    """
+    검색 캐시 키용 정규화: normalize_tag_name처럼 앞뒤 공백 제거 + 소문자,
+    단 공백은 지우지 않고 한 칸으로만 합침 (검색은 공백 기준 단어별 AND라 결과가 달라질 수 있음)
+    """
+    return " ".join(query.lower().split())
+
+
+def search_cache_key(query: str, limit: int) -> str:
+    """
+    books_search 결과(순위대로 정렬된 ISBN 리스트) 캐시 키
+    - 검색어는 해시 (memcached 키에 한글/공백 불가)
+    - 세대 번호가 바뀌면 이전 키는 더 이상 조회되지 않고 TTL로 사라짐
+    - 세대 키가 없으면(캐시 재시작/축출) 현재 시각으로 시작해서 예전 세대 번호와 겹치지 않게 함
+    """
+    generation = cache.get_or_set(SEARCH_GENERATION_KEY, time.time_ns, None)
+    digest = hashlib.md5(normalize_search_query(query).encode("utf-8")).hexdigest()
+    return f"books_search:{generation}:{limit}:{digest}"
+
+
+def invalidate_search_results():
+    """
+    검색 인덱스가 바뀐 뒤 호출 (도서 등록/수정/삭제, 작가 변경, 인덱스 재생성)
+    """
+    try:
+        cache.incr(SEARCH_GENERATION_KEY)
+    except ValueError:
+        cache.set(SEARCH_GENERATION_KEY, time.time_ns(), None)
@@ -0,0 +1,226 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Book, GenreChild
+from .search import compact_text
+
+logger = logging.getLogger(__name__)
+
+# facet 응답에 내려줄 태그 개수 (count 상위)
+FACET_TAG_LIMIT = 20
+
+
+def _range_bits(lo: int, hi: int) -> int:
+    """doc id [lo, hi) 구간 비트맵"""
+    if hi <= lo:
+        return 0
+    return ((1 << hi) - 1) ^ ((1 << lo) - 1)
+
+
+def iter_bits(bits: int) -> list[int]:
+    """비트맵에서 켜진 doc id 목록 (작은 것부터)"""
+    return [i for i, b in enumerate(bin(bits)[:1:-1]) if b == "1"]
+
+
+class FacetSnapshot:
+    """
+    한 시점의 facet 인덱스. 요청 하나는 같은 스냅샷만 사용 (재생성되면 doc id가 바뀜)
+
+    - 도서마다 doc id(0..N-1)를 출간일 순으로 부여하고, facet 값마다 doc id 비트맵(int)을 저장
+      -> 필터 조합은 비트 AND, facet 개수는 (비트맵 & 결과).bit_count()
+    - 출간일 순으로 id를 줬기 때문에 날짜 범위는 bisect 두 번 + 연속 구간 비트맵
+    """
+
+    def __init__(self):
+        genre_parent_of = {}
+        self.genre_names = {}
+        self.genre_parent_names = {}
+        for genre_id, name, parent_id, parent_name in GenreChild.objects.values_list(
+            "id", "name", "parent_id", "parent__name"
+        ):
+            genre_parent_of[genre_id] = parent_id
+            self.genre_names[genre_id] = name
+            self.genre_parent_names[parent_id] = parent_name
+
+        rows = list(
+            Book.objects
+            .order_by("published_date", "isbn")
+            .values_list("isbn", "published_date", "genre_id", "lang", "top_tags", "like_count")
+        )
+
+        self.isbns, self.dates, self.like_counts = [], [], []
+        self.genre, self.genre_parent, self.lang, self.tags = {}, {}, {}, {}
+        self.tag_names = {}
+
+        for doc_id, (isbn, published_date, genre_id, lang, top_tags, like_count) in enumerate(rows):
+            bit = 1 << doc_id
+            self.isbns.append(isbn)
+            self.dates.append(published_date)
+            self.like_counts.append(like_count)
+
+            if genre_id is not None:
+                self.genre[genre_id] = self.genre.get(genre_id, 0) | bit
+                parent_id = genre_parent_of.get(genre_id)
+                if parent_id is not None:
+                    self.genre_parent[parent_id] = self.genre_parent.get(parent_id, 0) | bit
+            if lang:
+                self.lang[lang] = self.lang.get(lang, 0) | bit
+            for tag in top_tags or []:
+                key = compact_text(tag)
+                if key:
+                    self.tags[key] = self.tags.get(key, 0) | bit
+                    self.tag_names.setdefault(key, str(tag))
+
+        self.doc_ids = {isbn: i for i, isbn in enumerate(self.isbns)}
+        self.all = (1 << len(self.isbns)) - 1
+
+    def filter_bits(self, genre=None, genre_parent=None, lang=None, tags=(), published_from=None, published_to=None) -> int:
+        """
+        필터 조건을 모두 만족하는 도서 비트맵 (조건이 없으면 전체)
+        tags는 모두 포함(AND)
+        """
+        bits = self.all
+
+        if genre is not None:
+            bits &= self.genre.get(genre, 0)
+        if genre_parent is not None:
+            bits &= self.genre_parent.get(genre_parent, 0)
+        if lang:
+            bits &= self.lang.get(lang, 0)
+        for tag in tags:
+            bits &= self.tags.get(compact_text(tag), 0)
+
+        if published_from is not None or published_to is not None:
+            lo = bisect_left(self.dates, published_from) if published_from is not None else 0
+            hi = bisect_right(self.dates, published_to) if published_to is not None else len(self.dates)
+            bits &= _range_bits(lo, hi)
+
+        return bits
+
+    def bits_for_isbns(self, isbns) -> int:
+        bits = 0
+        for isbn in isbns:
+            doc_id = self.doc_ids.get(isbn)
+            if doc_id is not None:
+                bits |= 1 << doc_id
+        return bits
+
+    def contains(self, bits: int, isbn: str) -> bool:
+        doc_id = self.doc_ids.get(isbn)
+        return doc_id is not None and bool(bits >> doc_id & 1)
+
+    def top_isbns(self, bits: int, limit: int) -> list[str]:
+        """검색어 없이 필터만 있을 때: 좋아요 많은 순 상위 limit개"""
+        like_counts, isbns = self.like_counts, self.isbns
+        doc_ids = sorted(iter_bits(bits), key=lambda i: (-like_counts[i], isbns[i]))
+        return [isbns[i] for i in doc_ids[:limit]]
+
+    def facet_counts(self, bits: int) -> dict:
+        """결과 집합(bits) 안에서 facet 값별 도서 수 (0인 값은 제외)"""
+
+        def counts(postings):
+            result = []
+            for value, posting in postings.items():
+                count = (posting & bits).bit_count()
+                if count:
+                    result.append((value, count))
+            return sorted(result, key=lambda item: -item[1])
+
+        return {
+            "genre": [
+                {"id": genre_id, "name": self.genre_names.get(genre_id), "count": count}
+                for genre_id, count in counts(self.genre)
+            ],
+            "genre_parent": [
+                {"id": parent_id, "name": self.genre_parent_names.get(parent_id), "count": count}
+                for parent_id, count in counts(self.genre_parent)
+            ],
+            "lang": [
+                {"value": lang, "count": count}
+                for lang, count in counts(self.lang)
+            ],
+            "tags": [
+                {"name": self.tag_names[key], "count": count}
+                for key, count in counts(self.tags)[:FACET_TAG_LIMIT]
+            ],
+        }
+
+
+class FacetIndex:
+    """
+    도서 검색 필터(장르/언어/태그/출간일)용 프로세스 내 facet 인덱스.
+    첫 요청 때 생성, 도서가 바뀌면 signals에서 mark_stale(), FACET_REBUILD_SECONDS마다 전체 재생성
+    재생성은 백그라운드 스레드 하나가 하고, 그동안 요청은 이전 스냅샷으로 바로 응답 (끝나면 교체)
+    """
+
+    def __init__(self, rebuild_seconds: int):
+        self.rebuild_seconds = rebuild_seconds
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._built_at = None
+        self._rebuilding = False
+        self._stale_while_rebuilding = False
+
+    def _is_fresh(self) -> bool:
+        return time.monotonic() - self._built_at < self.rebuild_seconds
+
+    def snapshot(self) -> FacetSnapshot:
+        if self._snapshot is None:
+            # 돌려줄 스냅샷이 아직 없으므로 첫 생성만 요청 안에서 (동시에 온 요청은 기다림)
+            with self._lock:
+                if self._snapshot is None:
+                    self._swap(FacetSnapshot())
+            return self._snapshot
+
+        if not self._rebuilding and not self._is_fresh():
+            with self._lock:
+                start = not self._rebuilding and not self._is_fresh()
+                if start:
+                    self._rebuilding = True
+                    self._stale_while_rebuilding = False
+            if start:
+                threading.Thread(target=self._rebuild_in_background, name="facet-rebuild", daemon=True).start()
+        return self._snapshot
+
+    def _rebuild_in_background(self):
+        try:
+            snapshot = FacetSnapshot()
+        except Exception:
+            logger.exception("facet index rebuild failed")
+            snapshot = None
+        finally:
+            # 풀 밖 스레드라 DB 연결이 자동으로 정리되지 않음
+            connection.close()
+
+        with self._lock:
+            if snapshot is not None:
+                self._swap(snapshot)
+            else:
+                self._built_at = time.monotonic()  # 실패해도 이전 스냅샷으로 한 주기 더 응답
+            if self._stale_while_rebuilding:
+                # 재생성이 읽은 뒤에 바뀐 도서가 있을 수 있음 -> 다음 조회 때 다시
+                self._built_at = float("-inf")
+            self._rebuilding = False
+
+    def _swap(self, snapshot):
+        self._snapshot = snapshot
+        self._built_at = time.monotonic()
+
+    def rebuild(self):
+        """전체 재생성 (요청 안에서 바로)"""
+        snapshot = FacetSnapshot()
+        with self._lock:
+            self._swap(snapshot)
+
+    def mark_stale(self):
+        """다음 조회 때 다시 생성"""
+        self._stale_while_rebuilding = True
+        self._built_at = float("-inf")
+
+
+facet_index = FacetIndex(settings.FACET_REBUILD_SECONDS)
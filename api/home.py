@@ -0,0 +1,97 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from accounts.serializers import AccountMeSerializer
+
+from .caches import HOME_POPULAR_CACHE_TIMEOUT, home_popular_cache_key
+from .constants import MAIN_BANNERS
+from .models import PopularSnapshot
+from .popular import popular_items, with_user_flags
+from .reading_status import current_reading_history
+from .serializers import CurrentReadingBookSerializer, PopularBookSerializer
+
+logger = logging.getLogger(__name__)
+
+BANNER_LIMIT = 4
+
+# 메인 화면에 기본으로 싣는 인기 목록
+HOME_POPULAR_KINDS = (
+    PopularSnapshot.Kind.WEEKLY,
+    PopularSnapshot.Kind.MONTHLY,
+    PopularSnapshot.Kind.STEADY,
+)
+
+# 섹션 조회용 스레드 (요청마다 새로 만들지 않고 재사용)
+home_executor = ThreadPoolExecutor(
+    max_workers=settings.HOME_SECTION_WORKERS,
+    thread_name_prefix="home-section",
+)
+
+
+def main_banners() -> list[dict]:
+    # order 기준 정렬 + 상위 N개만 반환
+    return sorted(MAIN_BANNERS, key=lambda x: x.get("order", 999))[:BANNER_LIMIT]
+
+
+def _account_section(user):
+    # is_coldstart_completed가 trait을 조회하므로 DB 접근 있음
+    return AccountMeSerializer(user).data
+
+
+def _current_reading_section(user):
+    history = current_reading_history(user)
+    return CurrentReadingBookSerializer(history).data if history else None
+
+
+def _popular_section(user, kind):
+    items = cache.get_or_set(
+        home_popular_cache_key(kind),
+        lambda: popular_items(kind),
+        HOME_POPULAR_CACHE_TIMEOUT,
+    )
+    return PopularBookSerializer(with_user_flags(user, items), many=True).data
+
+
+def _in_thread(fn, *args):
+    """
+    풀 스레드는 요청 처리 흐름 밖이라 DB 연결이 자동으로 정리되지 않음 -> 섹션마다 닫음
+    """
+    try:
+        return fn(*args)
+    finally:
+        connection.close()
+
+
+def build_home(user, kinds) -> tuple[dict, dict]:
+    """
+    메인 화면 섹션을 동시에 조회. (섹션 dict, 실패한 섹션별 에러 코드) 반환
+    실패한 섹션 값은 None (인기 목록은 빈 목록)
+    """
+    jobs = {("popular", kind): (_popular_section, user, kind) for kind in kinds}
+    if user.is_authenticated:
+        jobs["account"] = (_account_section, user)
+        jobs["current_reading_book"] = (_current_reading_section, user)
+
+    futures = {key: home_executor.submit(_in_thread, *job) for key, job in jobs.items()}
+
+    errors = {}
+    results = {}
+    for key, future in futures.items():
+        try:
+            results[key] = future.result()
+        except Exception:
+            name = key if isinstance(key, str) else f"popular.{key[1]}"
+            logger.exception("home section failed: %s", name)
+            errors[name] = "INTERNAL_SERVER_ERROR"
+
+    home = {
+        "account": results.get("account"),
+        "current_reading_book": results.get("current_reading_book"),
+        "banners": main_banners(),
+        "popular": {kind: results.get(("popular", kind), []) for kind in kinds},
+    }
+    return home, errors
@@ -0,0 +1,171 @@
+import hashlib
+from bisect import bisect_right
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Book, BookIngestTask
+from . import text_store
+
+CHECKSUM_CHUNK_BYTES = 1024 * 1024
+CLAIM_BATCH = 10
+
+
+def enqueue_ingestion(book: Book) -> BookIngestTask:
+    """
+    업로드 직후 호출: 실제 처리는 ingest_books 커맨드(워커)가 담당
+    """
+    return BookIngestTask.objects.create(book=book)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHECKSUM_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _normalize_title(title) -> str:
+    return "".join(str(title or "").split()).lower()
+
+
+def build_chapter_map(toc, chapters, nav_entries, total_length) -> list[dict]:
+    """
+    Book.toc 항목마다 본문 [start, end) 글자 위치를 붙인다.
+    - toc 제목 == EPUB 목차 제목이면, 그 목차 링크가 가리키는 챕터의 시작 위치
+    - end는 다음으로 시작하는 항목 위치 (없으면 본문 끝)
+    - 매칭 실패한 항목은 start/end = None
+    """
+    chapter_start = {c["href"]: c["start"] for c in chapters}
+
+    nav_start = {}
+    for entry in nav_entries:
+        start = chapter_start.get(entry["href"])
+        key = _normalize_title(entry["title"])
+        if start is not None and key and key not in nav_start:
+            nav_start[key] = start
+
+    result = []
+    for item in toc or []:
+        if not isinstance(item, dict):
+            continue
+        result.append({
+            "index": item.get("index"),
+            "title": item.get("title"),
+            "start": nav_start.get(_normalize_title(item.get("title"))),
+        })
+
+    starts = sorted({r["start"] for r in result if r["start"] is not None})
+    for r in result:
+        if r["start"] is None:
+            r["end"] = None
+            continue
+        i = bisect_right(starts, r["start"])
+        r["end"] = starts[i] if i < len(starts) else total_length
+
+    return result
+
+
+def ingest_book(book: Book):
+    """
+    EPUB 1권 후처리: 본문 텍스트 저장소 생성 + 길이/단어 수/체크섬/챕터 맵을 Book에 저장
+    """
+    epub_path = text_store.resolve_epub_path(book.epub_file)
+
+    result = text_store.build_text_store(book.isbn, epub_path, book.text_layout)
+    nav_entries = text_store.epub_nav_entries(epub_path)
+
+    book.text_length = result["total_length"]
+    book.word_count = result["word_count"]
+    if not book.epub_checksum:
+        # 업로드 시 스트림에서 계산된 값이 없을 때만 (JSON 등록, 기존 도서)
+        book.epub_checksum = file_sha256(epub_path)
+    book.chapter_map = build_chapter_map(book.toc, result["chapters"], nav_entries, result["total_length"])
+    book.text_ingested_at = timezone.now()
+    book.save(update_fields=[
+        "text_length", "word_count", "epub_checksum", "chapter_map", "text_ingested_at",
+    ])
+
+
+def _stale_running_q(now) -> Q:
+    # INGEST_TASK_TIMEOUT_SECONDS보다 오래 RUNNING인 작업 (처리 중에 워커가 죽으면 RUNNING으로 영영 남으므로)
+    stale_before = now - timedelta(seconds=settings.INGEST_TASK_TIMEOUT_SECONDS)
+    return Q(status=BookIngestTask.Status.RUNNING, started_at__lt=stale_before)
+
+
+def claimable_q(now=None) -> Q:
+    """
+    가져갈 수 있는 작업: PENDING, 또는 멈춘 RUNNING 중 INGEST_TASK_MAX_ATTEMPTS번 미만 시도한 작업
+    """
+    now = now or timezone.now()
+    return Q(status=BookIngestTask.Status.PENDING) | (
+        _stale_running_q(now) & Q(attempts__lt=settings.INGEST_TASK_MAX_ATTEMPTS)
+    )
+
+
+def fail_exhausted_tasks(now=None) -> int:
+    """
+    멈춘 RUNNING 중 시도 횟수를 다 쓴 작업을 FAILED로 (매번 워커를 죽이는 EPUB을 끝없이 다시 가져가지 않도록)
+    --retry-failed로 다시 대기열에 넣을 수 있음
+    """
+    now = now or timezone.now()
+    return (
+        BookIngestTask.objects
+        .filter(_stale_running_q(now), attempts__gte=settings.INGEST_TASK_MAX_ATTEMPTS)
+        .update(
+            status=BookIngestTask.Status.FAILED,
+            error_message=f"처리 중 {settings.INGEST_TASK_MAX_ATTEMPTS}번 멈춰서 중단",
+            finished_at=now,
+        )
+    )
+
+
+def claim_next_task() -> BookIngestTask | None:
+    """
+    PENDING(또는 멈춘 RUNNING) -> RUNNING 전환에 성공한 작업 1개 반환
+    (여러 워커가 떠도 같은 작업을 중복 처리하지 않음, 가져갈 때마다 attempts + 1)
+    """
+    now = timezone.now()
+    fail_exhausted_tasks(now)
+    candidate_ids = list(
+        BookIngestTask.objects
+        .filter(claimable_q(now))
+        .order_by("created_at")
+        .values_list("id", flat=True)[:CLAIM_BATCH]
+    )
+    for task_id in candidate_ids:
+        claimed = (
+            BookIngestTask.objects
+            .filter(claimable_q(now), id=task_id)
+            .update(
+                status=BookIngestTask.Status.RUNNING,
+                started_at=now,
+                attempts=F("attempts") + 1,
+            )
+        )
+        if claimed:
+            return BookIngestTask.objects.select_related("book").get(id=task_id)
+    return None
+
+
+def run_task(task: BookIngestTask) -> BookIngestTask:
+    try:
+        ingest_book(task.book)
+    except Exception as e:
+        task.status = BookIngestTask.Status.FAILED
+        task.error_message = str(e)
+    else:
+        task.status = BookIngestTask.Status.DONE
+        task.error_message = None
+
+    task.finished_at = timezone.now()
+    # 시간 초과로 다른 워커가 다시 가져간 작업이면 (started_at이 바뀜) 그쪽 결과를 덮어쓰지 않음
+    BookIngestTask.objects.filter(id=task.id, started_at=task.started_at).update(
+        status=task.status,
+        error_message=task.error_message,
+        finished_at=task.finished_at,
+    )
+    return task
@@ -0,0 +1,30 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.reading_log import SESSION_GAP, compact_day
+
+
+class Command(BaseCommand):
+    help = "Roll up the append-only reading event log into ReadingSessionSummary rows (default: yesterday)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--day", help="압축할 날짜 (YYYY-MM-DD, 기본: 어제)")
+        parser.add_argument("--days", type=int, default=1, help="--day부터 거꾸로 며칠치를 압축할지 (기본: 1)")
+        parser.add_argument(
+            "--session-gap-minutes", type=int, default=int(SESSION_GAP.total_seconds() // 60),
+            help="이 시간(분)보다 오래 이벤트가 없으면 세션을 나눔",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            last_day = date.fromisoformat(options["day"]) if options["day"] else timezone.localdate() - timedelta(days=1)
+        except ValueError:
+            raise CommandError("--day는 YYYY-MM-DD 형식이어야 합니다.")
+        session_gap = timedelta(minutes=options["session_gap_minutes"])
+
+        for offset in range(max(options["days"], 1)):
+            day = last_day - timedelta(days=offset)
+            events, sessions = compact_day(day, session_gap)
+            self.stdout.write(self.style.SUCCESS(f"{day}: {events} events -> {sessions} sessions"))
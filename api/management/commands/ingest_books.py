@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.ingestion import claim_next_task, enqueue_ingestion, run_task
+from api.models import Book, BookIngestTask
+
+
+class Command(BaseCommand):
+    help = "Process pending EPUB ingestion tasks (text store, length, word count, checksum, chapter map)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="대기 작업을 계속 폴링하는 워커로 실행")
+        parser.add_argument("--interval", type=float, default=2.0, help="--loop 폴링 간격(초)")
+        parser.add_argument("--isbn", nargs="*", default=[], help="지정한 도서를 다시 인제스트 대기열에 추가")
+        parser.add_argument("--retry-failed", action="store_true", help="FAILED 작업을 다시 대기열로")
+        # 시간 초과로 멈춘 RUNNING 작업은 옵션 없이도 claim_next_task가 다시 가져감 (INGEST_TASK_TIMEOUT_SECONDS)
+        # INGEST_TASK_MAX_ATTEMPTS번 멈춘 작업은 FAILED가 되므로 --retry-failed로 다시 넣어야 함
+
+    def handle(self, *args, **options):
+        # 1) 수동 재처리 요청 (EPUB이 교체됐을 수 있으므로 체크섬도 다시 계산)
+        books = Book.objects.filter(isbn__in=options["isbn"])
+        books.update(epub_checksum="")
+        for book in books:
+            enqueue_ingestion(book)
+
+        if options["retry_failed"]:
+            BookIngestTask.objects.filter(
+                status=BookIngestTask.Status.FAILED
+            ).update(status=BookIngestTask.Status.PENDING, attempts=0)
+
+        # 2) 대기 작업 처리 (--loop면 계속)
+        while True:
+            task = claim_next_task()
+            if task is None:
+                if not options["loop"]:
+                    break
+                close_old_connections()
+                time.sleep(options["interval"])
+                continue
+
+            run_task(task)
+            if task.status == BookIngestTask.Status.DONE:
+                self.stdout.write(self.style.SUCCESS(f"Ingested {task.book_id}."))
+            else:
+                self.stdout.write(self.style.ERROR(f"Failed {task.book_id}: {task.error_message}"))
+
+        self.stdout.write(self.style.SUCCESS("Ingestion queue drained."))
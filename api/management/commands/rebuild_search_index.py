@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.caches import invalidate_search_results
+from api.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the book search index from Book / Author tables."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.rebuild()
+        invalidate_search_results()
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt ({type(backend).__name__})."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from api.reading_status import READING_INACTIVE_DAYS, READING_MIN_DAYS_BEFORE_STOP, stop_stale_reading
+
+
+class Command(BaseCommand):
+    help = "Mark READING histories with no activity for a while as STOPPED (single set-based UPDATE)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--inactive-days", type=int, default=READING_INACTIVE_DAYS,
+            help="이 기간(일) 이상 읽지 않은 READING 기록을 중단 처리",
+        )
+        parser.add_argument(
+            "--min-days-before-stop", type=int, default=READING_MIN_DAYS_BEFORE_STOP,
+            help="시작한 지 이 기간(일) 이내인 기록은 제외",
+        )
+
+    def handle(self, *args, **options):
+        stopped = stop_stale_reading(
+            inactive_days=options["inactive_days"],
+            min_days_before_stop=options["min_days_before_stop"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Stale reading histories stopped ({stopped} rows)."))
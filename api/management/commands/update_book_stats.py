@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.book_stats import STAT_FIELDS, update_book_stats
+
+
+class Command(BaseCommand):
+    help = "Update Book.readed_num_week / readed_num_month / is_steady from daily read buckets (last 7 / 30 / 90 days)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fields", nargs="*", choices=STAT_FIELDS, default=list(STAT_FIELDS),
+            help="갱신할 집계 필드 (기본: 전부)",
+        )
+
+    def handle(self, *args, **options):
+        changed = update_book_stats(options["fields"])
+        self.stdout.write(self.style.SUCCESS(f"Book stats updated ({changed} books changed)."))
@@ -1,33 +1,11 @@
-from datetime import timedelta
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from django.db.models import Count
 
-from api.models import Book, UserBookHistory
-
-STEADY_MIN_90D = 20  # 서비스 규모에 맞게 조절
+from api.book_stats import update_book_stats
 
 
 class Command(BaseCommand):
-    help = "Update Book.is_steady (based on last 90 days)."
+    help = "Update Book.is_steady (based on last 90 days). Same as update_book_stats --fields is_steady."
 
     def handle(self, *args, **options):
-        now = timezone.now()
-        start_dt = now - timedelta(days=90)
-
-        rows = (
-            UserBookHistory.objects
-            .filter(last_read_at__gte=start_dt)
-            .values("book")
-            .annotate(cnt=Count("id"))
-        )
-
-        Book.objects.update(is_steady=False)
-
-        for r in rows:
-            isbn = r["book"]
-            cnt = r["cnt"]
-            if cnt >= STEADY_MIN_90D:
-                Book.objects.filter(isbn=isbn).update(is_steady=True)
-
-        self.stdout.write(self.style.SUCCESS("Steady books updated."))
\ No newline at end of file
+        update_book_stats(["is_steady"])
+        self.stdout.write(self.style.SUCCESS("Steady books updated."))
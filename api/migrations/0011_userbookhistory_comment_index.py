@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_book_ingest"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="userbookhistory",
+            index=models.Index(
+                condition=models.Q(
+                    ("comment__isnull", False), models.Q(("comment", ""), _negated=True)
+                ),
+                fields=["book", "-last_read_at", "-id"],
+                name="ubh_book_comment_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:50
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def fill_comment_count(apps, schema_editor):
+    Book = apps.get_model("api", "Book")
+    UserBookHistory = apps.get_model("api", "UserBookHistory")
+
+    rows = (
+        UserBookHistory.objects
+        .filter(Q(comment__isnull=False) & ~Q(comment=""))
+        .values("book")
+        .annotate(cnt=Count("id"))
+    )
+    books = []
+    for r in rows:
+        books.append(Book(isbn=r["book"], comment_count=r["cnt"]))
+    Book.objects.bulk_update(books, ["comment_count"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_userbookhistory_comment_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="userbookhistory",
+            index=models.Index(
+                condition=models.Q(
+                    ("comment__isnull", False), models.Q(("comment", ""), _negated=True)
+                ),
+                fields=["user", "-updated_at"],
+                name="ubh_user_comment_idx",
+            ),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+
+
+def create_fts_table(apps, schema_editor):
+    # FTS5는 SQLite 전용 (다른 DB는 BOOK_SEARCH_BACKEND를 IcontainsSearchBackend로)
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    schema_editor.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS api_book_fts USING fts5(
+            isbn UNINDEXED,
+            title,
+            subtitle,
+            publisher,
+            authors,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    schema_editor.execute(
+        """
+        INSERT INTO api_book_fts (isbn, title, subtitle, publisher, authors)
+        SELECT
+            b.isbn,
+            b.title,
+            COALESCE(b.subtitle, ''),
+            b.publisher,
+            COALESCE((
+                SELECT group_concat(a.name, ' ')
+                FROM api_authorsbook AS ab
+                JOIN api_author AS a ON a.id = ab.author_id
+                WHERE ab.book_id = b.isbn
+            ), '')
+        FROM api_book AS b
+        """
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS api_book_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0012_book_comment_count"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,107 @@
+import re
+import unicodedata
+from importlib import import_module
+
+from django.db import migrations
+
+# 이 시점의 색인 규칙을 고정해 둔 사본 (api.search가 바뀌어도 이 마이그레이션 결과는 그대로)
+INSERT_SQL = (
+    "INSERT INTO api_book_fts (isbn, title, subtitle, publisher, authors, initials) "
+    "VALUES (%s, %s, %s, %s, %s, %s)"
+)
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+HANGUL_BASE, HANGUL_LAST = 0xAC00, 0xD7A3
+JUNGSUNG_JONGSUNG = 21 * 28
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def compact_text(text):
+    return _NON_WORD.sub("", unicodedata.normalize("NFC", str(text or "")).lower())
+
+
+def to_chosung(text):
+    out = []
+    for ch in compact_text(text):
+        code = ord(ch)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            out.append(CHOSUNG[(code - HANGUL_BASE) // JUNGSUNG_JONGSUNG])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def bigram_tokens(*values):
+    tokens = []
+    for value in values:
+        if not value:
+            continue
+        tokens.extend(value[i:i + 2] for i in range(len(value) - 1))
+        tokens.append(value[-1])
+    return " ".join(tokens)
+
+
+def index_document(isbn, title, subtitle, publisher, author_names):
+    return (
+        isbn,
+        bigram_tokens(compact_text(title)),
+        bigram_tokens(compact_text(subtitle)),
+        bigram_tokens(compact_text(publisher)),
+        bigram_tokens(*(compact_text(name) for name in author_names)),
+        bigram_tokens(to_chosung(title), *(to_chosung(name) for name in author_names)),
+    )
+
+
+def recreate_fts_table(apps, schema_editor):
+    # 원문 단어 대신 bigram 토큰열 + 초성(initials) 컬럼으로 재생성 (SQLite 전용)
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    Book = apps.get_model("api", "Book")
+    AuthorsBook = apps.get_model("api", "AuthorsBook")
+
+    schema_editor.execute("DROP TABLE IF EXISTS api_book_fts")
+    schema_editor.execute(
+        """
+        CREATE VIRTUAL TABLE api_book_fts USING fts5(
+            isbn UNINDEXED,
+            title,
+            subtitle,
+            publisher,
+            authors,
+            initials,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        """
+    )
+
+    author_names = {}
+    for book_id, name in AuthorsBook.objects.values_list("book_id", "author__name"):
+        author_names.setdefault(book_id, []).append(name)
+
+    rows = [
+        index_document(isbn, title, subtitle, publisher, author_names.get(isbn, []))
+        for isbn, title, subtitle, publisher in Book.objects.values_list(
+            "isbn", "title", "subtitle", "publisher"
+        )
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(INSERT_SQL, rows)
+
+
+def restore_word_fts_table(apps, schema_editor):
+    # 0013의 단어 단위 테이블로 되돌림
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS api_book_fts")
+    import_module("api.migrations.0013_book_fts").create_fts_table(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0013_book_fts"),
+    ]
+
+    operations = [
+        migrations.RunPython(recreate_fts_table, restore_word_fts_table),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0014_book_fts_ngram"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PopularSnapshot",
+            fields=[
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("weekly", "주간"),
+                            ("monthly", "월간"),
+                            ("steady", "스테디"),
+                        ],
+                        max_length=10,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("isbns", models.JSONField(blank=True, default=list)),
+                ("items", models.JSONField(blank=True, default=list)),
+                ("generated_at", models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:01
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def fill_read_daily(apps, schema_editor):
+    # 기존 기록은 마지막으로 읽은 날(last_read_at)에 1회 읽은 것으로 채움 (최근 90일)
+    BookReadDaily = apps.get_model("api", "BookReadDaily")
+    UserBookHistory = apps.get_model("api", "UserBookHistory")
+
+    rows = (
+        UserBookHistory.objects
+        .filter(last_read_at__gte=timezone.now() - timedelta(days=90))
+        .annotate(day=TruncDate("last_read_at"))
+        .values("book", "day")
+        .annotate(cnt=Count("id"))
+    )
+    BookReadDaily.objects.bulk_create(
+        [BookReadDaily(book_id=r["book"], day=r["day"], count=r["cnt"]) for r in rows],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0015_popular_snapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookReadDaily",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="read_daily_list",
+                        to="api.book",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["day"], name="api_bookrea_day_ba7924_idx")
+                ],
+                "unique_together": {("book", "day")},
+            },
+        ),
+        migrations.RunPython(fill_read_daily, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:02
+
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+
+# 이 시점의 점수 규칙을 고정해 둔 사본 (api.trending이 바뀌어도 이 마이그레이션 결과는 그대로)
+TRENDING_WEIGHTS = {"read": 1.0, "like": 3.0, "comment": 2.0}
+TRENDING_HALF_LIFE = timedelta(days=3)
+TRENDING_EPOCH = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def trending_increment(event, at):
+    return TRENDING_WEIGHTS[event] * 2 ** ((at - TRENDING_EPOCH) / TRENDING_HALF_LIFE)
+
+
+def fill_trending_score(apps, schema_editor):
+    # 최근 90일 읽기(일별 버킷, 그날 정오 기준) / 좋아요 / 코멘트로 초기 점수 계산
+    Book = apps.get_model("api", "Book")
+    BookReadDaily = apps.get_model("api", "BookReadDaily")
+    UserBookLike = apps.get_model("api", "UserBookLike")
+    UserBookHistory = apps.get_model("api", "UserBookHistory")
+
+    since = timezone.now() - timedelta(days=90)
+    scores = {}
+
+    for book_id, day, count in BookReadDaily.objects.filter(day__gte=since.date()).values_list("book_id", "day", "count"):
+        at = timezone.make_aware(datetime.combine(day, time(12)))
+        scores[book_id] = scores.get(book_id, 0.0) + count * trending_increment("read", at)
+
+    for book_id, created_at in UserBookLike.objects.filter(created_at__gte=since).values_list("book_id", "created_at"):
+        scores[book_id] = scores.get(book_id, 0.0) + trending_increment("like", created_at)
+
+    comments = (
+        UserBookHistory.objects
+        .filter(Q(comment__isnull=False) & ~Q(comment=""), updated_at__gte=since)
+        .values_list("book_id", "updated_at")
+    )
+    for book_id, updated_at in comments:
+        scores[book_id] = scores.get(book_id, 0.0) + trending_increment("comment", updated_at)
+
+    Book.objects.bulk_update(
+        [Book(isbn=isbn, trending_score=score) for isbn, score in scores.items()],
+        ["trending_score"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0016_book_read_daily"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="trending_score",
+            field=models.FloatField(db_index=True, default=0.0),
+        ),
+        migrations.RunPython(fill_trending_score, migrations.RunPython.noop),
+    ]
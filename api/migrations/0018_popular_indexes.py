@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0017_book_trending_score"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                condition=models.Q(("readed_num_week__gt", 0)),
+                fields=["-readed_num_week", "-like_count"],
+                name="book_popular_week_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                condition=models.Q(("readed_num_month__gt", 0)),
+                fields=["-readed_num_month", "-like_count"],
+                name="book_popular_month_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                condition=models.Q(("is_steady", True)),
+                fields=["-readed_num_month", "-like_count"],
+                name="book_steady_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userbookhistory",
+            index=models.Index(
+                condition=models.Q(("status", "READING")),
+                fields=["last_read_at"],
+                name="ubh_reading_last_read_idx",
+            ),
+        ),
+    ]
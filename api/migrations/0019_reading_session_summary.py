@@ -0,0 +1,70 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0018_popular_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReadingSessionSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("started_at", models.DateTimeField()),
+                ("ended_at", models.DateTimeField()),
+                ("duration_seconds", models.PositiveIntegerField()),
+                ("progress_events", models.PositiveIntegerField(default=0)),
+                ("content_requests", models.PositiveIntegerField(default=0)),
+                ("location_unit", models.CharField(default="char", max_length=10)),
+                ("start_location", models.PositiveIntegerField(blank=True, null=True)),
+                ("end_location", models.PositiveIntegerField(blank=True, null=True)),
+                ("start_percent", models.FloatField(blank=True, null=True)),
+                ("end_percent", models.FloatField(blank=True, null=True)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reading_sessions",
+                        to="api.book",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reading_sessions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["day"], name="api_reading_day_f93b3d_idx"),
+                    models.Index(
+                        fields=["user", "book", "started_at"],
+                        name="api_reading_user_id_b62a38_idx",
+                    ),
+                    models.Index(
+                        fields=["book", "started_at"],
+                        name="api_reading_book_id_36761c_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
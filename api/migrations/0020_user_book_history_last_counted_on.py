@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:54
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def fill_last_counted_on(apps, schema_editor):
+    # 지금까지는 last_read_at 날짜가 기준이었으므로 그 날짜로 채움 (배포 당일 같은 날을 두 번 세지 않도록)
+    UserBookHistory = apps.get_model("api", "UserBookHistory")
+    UserBookHistory.objects.filter(last_read_at__isnull=False).update(
+        last_counted_on=TruncDate("last_read_at", tzinfo=timezone.get_current_timezone())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0019_reading_session_summary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userbookhistory",
+            name="last_counted_on",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(fill_last_counted_on, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:10
+
+from django.db import migrations, models
+from django.db.models import F, Q
+
+
+def fill_commented_at(apps, schema_editor):
+    # 기존 코멘트는 작성 시각이 따로 없으므로 0017 트렌딩 점수 계산과 같은 updated_at으로 채움
+    UserBookHistory = apps.get_model("api", "UserBookHistory")
+    UserBookHistory.objects.filter(Q(comment__isnull=False) & ~Q(comment="")).update(commented_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0020_user_book_history_last_counted_on"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userbookhistory",
+            name="commented_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(fill_commented_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:57
+
+from django.db import migrations, models
+
+
+def reingest_existing_books(apps, schema_editor):
+    # 이미 인제스트된 도서의 text_length / chapter_map은 spine 순서로 계산됨 -> manifest 순서로 다시 계산
+    # (저장된 본문 파일은 INDEX_VERSION이 올라가서 다음 조회 때 다시 만들어짐)
+    Book = apps.get_model("api", "Book")
+    BookIngestTask = apps.get_model("api", "BookIngestTask")
+    BookIngestTask.objects.bulk_create([
+        BookIngestTask(book_id=isbn)
+        for isbn in Book.objects.filter(text_ingested_at__isnull=False).values_list("isbn", flat=True)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0021_user_book_history_commented_at"),
+    ]
+
+    operations = [
+        # 기존 도서는 저장된 읽기 위치가 가리키는 예전(ebooklib) 본문 순서를 유지
+        migrations.AddField(
+            model_name="book",
+            name="text_layout",
+            field=models.CharField(
+                choices=[("spine", "spine 순서"), ("manifest", "manifest 순서")],
+                default="manifest",
+                max_length=10,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="book",
+            name="text_layout",
+            field=models.CharField(
+                choices=[("spine", "spine 순서"), ("manifest", "manifest 순서")],
+                default="spine",
+                max_length=10,
+            ),
+        ),
+        migrations.RunPython(reingest_existing_books, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0022_book_text_layout"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="userbookhistory",
+            name="ubh_book_comment_idx",
+        ),
+        migrations.AddIndex(
+            model_name="userbookhistory",
+            index=models.Index(
+                condition=models.Q(
+                    ("comment__isnull", False), models.Q(("comment", ""), _negated=True)
+                ),
+                fields=["book", "-commented_at", "-id"],
+                name="ubh_book_comment_idx",
+            ),
+        ),
+    ]
@@ -65,6 +65,10 @@ class GenreChild(models.Model):
         return f"{self.parent.name} > {self.name}"
     
 class Book(models.Model):
+    class TextLayout(models.TextChoices):
+        SPINE = "spine", "spine 순서"
+        MANIFEST = "manifest", "manifest 순서"
+
     # ===== 도서 메타 정보 =====
     isbn = models.CharField(primary_key=True, max_length=13)
     title = models.CharField(max_length=255)
@@ -94,6 +98,8 @@ class Book(models.Model):
     readed_num_week = models.PositiveIntegerField(default=0)
     readed_num_month = models.PositiveIntegerField(default=0)
     like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)  # 코멘트 작성/삭제 시 즉시 증감
+    trending_score = models.FloatField(default=0.0, db_index=True)  # 시간 감쇠 인기 점수 (api.trending)
     is_steady = models.BooleanField(default=False)
 
     # ===== AI GENERATOR =====
@@ -103,6 +109,36 @@ class Book(models.Model):
     top_tags = models.JSONField(default=list, blank=True)
     top_tags_updated_at = models.DateTimeField(null=True, blank=True)
 
+    # ===== EPUB 인제스트 결과 (업로드 후 백그라운드로 채움) =====
+    text_length = models.PositiveIntegerField(null=True, blank=True)   # 본문 전체 글자 수 (location_unit="char" 기준)
+    word_count = models.PositiveIntegerField(null=True, blank=True)
+    epub_checksum = models.CharField(max_length=64, blank=True, default="")  # EPUB 파일 sha256
+    chapter_map = models.JSONField(default=list, blank=True)  # toc 항목별 [start, end) 글자 위치
+    text_ingested_at = models.DateTimeField(null=True, blank=True)
+    # 본문을 이어 붙이는 문서 순서 (api.text_store.LAYOUT_*). 글자 위치 기준이 바뀌지 않도록 도서마다 고정
+    # 기존 도서는 manifest(ebooklib 시절), 새 도서는 spine
+    text_layout = models.CharField(max_length=10, choices=TextLayout.choices, default=TextLayout.SPINE)
+
+    class Meta:
+        indexes = [
+            # 인기 목록 (api.popular.popular_books_qs): 조건과 정렬을 그대로 맞춘 부분 인덱스
+            models.Index(
+                fields=["-readed_num_week", "-like_count"],
+                condition=models.Q(readed_num_week__gt=0),
+                name="book_popular_week_idx",
+            ),
+            models.Index(
+                fields=["-readed_num_month", "-like_count"],
+                condition=models.Q(readed_num_month__gt=0),
+                name="book_popular_month_idx",
+            ),
+            models.Index(
+                fields=["-readed_num_month", "-like_count"],
+                condition=models.Q(is_steady=True),
+                name="book_steady_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -137,6 +173,49 @@ class BookAIGenerationTask(models.Model):
             models.Index(fields=["book", "status", "-created_at"]),
         ]
 
+class BookIngestTask(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "대기"
+        RUNNING = "RUNNING", "실행중"
+        DONE = "DONE", "완료"
+        FAILED = "FAILED", "실패"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    book = models.ForeignKey(
+        "Book",
+        on_delete=models.CASCADE,
+        related_name="ingest_task_list",
+    )
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+class PopularSnapshot(models.Model):
+    """
+    인기 목록(books_popular) 스냅샷. update_popular_* 배치가 집계 후 저장
+    items에는 사용자와 무관한 응답 항목을 순위대로 저장 (is_liked/is_wished는 요청마다 덧씌움)
+    """
+    class Kind(models.TextChoices):
+        WEEKLY = "weekly", "주간"
+        MONTHLY = "monthly", "월간"
+        STEADY = "steady", "스테디"
+
+    kind = models.CharField(max_length=10, choices=Kind.choices, primary_key=True)
+    isbns = models.JSONField(default=list, blank=True)
+    items = models.JSONField(default=list, blank=True)
+    generated_at = models.DateTimeField()
+
 # --------------------------
 # Tag / BookTag / UserBookTag
 # --------------------------
@@ -228,6 +307,9 @@ class UserBookLike(models.Model):
 # --------------------------
 # UserBookHistory (통계 원천)
 # --------------------------
+# comment가 실제로 있는 기록 (부분 인덱스 조건과 조회 조건을 같은 식으로 맞춰야 인덱스를 탐)
+COMMENT_PRESENT = models.Q(comment__isnull=False) & ~models.Q(comment="")
+
 class UserBookHistory(models.Model):
     class Status(models.TextChoices):
         READING = "READING", "읽는 중"
@@ -244,11 +326,16 @@ class UserBookHistory(models.Model):
     started_at = models.DateTimeField() # 읽기 시작
     last_read_at = models.DateTimeField(blank=True, null=True)
     finished_at = models.DateTimeField(blank=True, null=True)
+    # 일별 읽기 수(BookReadDaily)에 마지막으로 센 날짜 (로컬). 사용자-도서-날짜당 1회 판정 전용
+    # (last_read_at은 코멘트 작성/버퍼 flush도 바꾸므로 기준으로 쓰지 않음)
+    last_counted_on = models.DateField(blank=True, null=True)
 
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.READING)
     progress_percent = models.FloatField(default=0.0)
     current_location = models.PositiveIntegerField(blank=True, null=True)
     comment = models.TextField(blank=True, null=True)
+    # 코멘트 작성 시각 (수정/읽기로 바뀌지 않음). 삭제 시 이 시각 기준으로 트렌딩 점수를 되돌림
+    commented_at = models.DateTimeField(blank=True, null=True)
 
     # 레코드 관리용
     created_at = models.DateTimeField(auto_now_add=True)  
@@ -258,6 +345,74 @@ class UserBookHistory(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=["user", "status", "-last_read_at"]),
+            # 도서 상세 코멘트 목록 (keyset 페이지네이션), 코멘트가 있는 행만
+            models.Index(
+                fields=["book", "-commented_at", "-id"],
+                condition=COMMENT_PRESENT,
+                name="ubh_book_comment_idx",
+            ),
+            # 오래 안 읽은 READING 기록 찾기 (last_read_at 범위 조회)
+            models.Index(
+                fields=["last_read_at"],
+                condition=models.Q(status="READING"),
+                name="ubh_reading_last_read_idx",
+            ),
+            # 내 코멘트 목록 (accounts.comment_list)
+            models.Index(
+                fields=["user", "-updated_at"],
+                condition=COMMENT_PRESENT,
+                name="ubh_user_comment_idx",
+            ),
+        ]
+
+class BookReadDaily(models.Model):
+    """
+    도서별 하루 읽은 사람 수 (사용자-도서-날짜당 최대 1회, bookview_progress에서 증가)
+    readed_num_week / readed_num_month / is_steady는 최근 7/30/90일 합으로 계산
+    """
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, related_name="read_daily_list"
+    )
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("book", "day")
+        indexes = [
+            models.Index(fields=["day"]),
+        ]
+
+class ReadingSessionSummary(models.Model):
+    """
+    읽기 이벤트 로그(api/reading_log.py)를 compact_reading_log가 세션 단위로 묶은 요약 (분석용)
+    요청 경로에서는 읽지도 쓰지도 않음
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="reading_sessions"
+    )
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, related_name="reading_sessions"
+    )
+    day = models.DateField()  # 원본 로그 파일 날짜 (다시 압축하면 이 날짜 행을 지우고 새로 씀)
+
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField()
+    duration_seconds = models.PositiveIntegerField()
+
+    progress_events = models.PositiveIntegerField(default=0)
+    content_requests = models.PositiveIntegerField(default=0)
+
+    location_unit = models.CharField(max_length=10, default="char")
+    start_location = models.PositiveIntegerField(blank=True, null=True)
+    end_location = models.PositiveIntegerField(blank=True, null=True)
+    start_percent = models.FloatField(blank=True, null=True)
+    end_percent = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["day"]),
+            models.Index(fields=["user", "book", "started_at"]),
+            models.Index(fields=["book", "started_at"]),
         ]
 
 # --------------------------
@@ -0,0 +1,181 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .caches import POPULAR_ITEMS_CACHE_TIMEOUT, home_popular_cache_key, popular_items_cache_key
+from .models import Book, PopularSnapshot, UserBookLike, Wishlist
+
+LIST_LIMIT = 30  # 인기 목록을 최대 30권까지만
+
+# 시간 감쇠 점수(Book.trending_score) 순 목록. 계속 바뀌므로 스냅샷 없이 인덱스로 바로 정렬
+TRENDING = "trending"
+POPULAR_KINDS = [*PopularSnapshot.Kind.values, TRENDING]
+
+# 인기 목록 항목에 들어가는 Book 필드 (이 필드가 바뀌면 해당 도서가 든 스냅샷을 지움)
+POPULAR_FIELDS = {
+    "title", "cover_image", "publisher", "abstract_descript", "like_count", "top_tags", "purchase_link",
+}
+
+
+def popular_books_qs(kind: str):
+    if kind == TRENDING:
+        return (
+            Book.objects
+            .filter(trending_score__gt=0)
+            .order_by("-trending_score")
+        )
+    if kind == PopularSnapshot.Kind.WEEKLY:
+        return (
+            Book.objects
+            .filter(readed_num_week__gt=0)
+            .order_by("-readed_num_week", "-like_count")
+        )
+    if kind == PopularSnapshot.Kind.MONTHLY:
+        return (
+            Book.objects
+            .filter(readed_num_month__gt=0)
+            .order_by("-readed_num_month", "-like_count")
+        )
+    # steady
+    return (
+        Book.objects
+        .filter(is_steady=True)
+        .order_by("-readed_num_month", "-like_count")
+    )
+
+
+def build_popular_items(kind: str) -> list[dict]:
+    """
+    인기 목록 응답 항목 (is_liked/is_wished 제외)을 순위대로 생성
+    """
+    books = list(
+        popular_books_qs(kind)
+        .prefetch_related("authors_book_list__author")[:LIST_LIMIT]
+    )
+
+    items = []
+    for book in books:
+        isbn = book.isbn
+
+        # top_tags string list
+        # DB에 저장된 top_tags(JSON) 앞 7개
+        tags_list = book.top_tags[:7] if book.top_tags else []
+
+        # 대표 작가 1명
+        main_author = None
+        # authors_book_list는 prefetch_related로 가져옴
+        authors = book.authors_book_list.all()
+        if authors:
+            # is_primary 우선, 없으면 첫 번째
+            primary = next((a for a in authors if a.is_primary), None)
+            if primary:
+                main_author = primary.author.name
+            else:
+                main_author = authors[0].author.name
+
+        items.append({
+            "isbn": isbn,
+            "title": book.title,
+            "cover_image": book.cover_image,
+            "publisher": book.publisher,
+            "abstract_descript": book.abstract_descript,
+
+            "like_count": book.like_count,
+            "top_tags": tags_list,
+            "genres": book.top_tags if book.top_tags else [],
+            "author": main_author,
+
+            "links": {
+                "like_toggle_url": f"/books/{isbn}/likes",
+                "read_url": f"/bookviews/{isbn}",
+                "purchase_url": book.purchase_link,
+            },
+        })
+    return items
+
+
+def write_popular_snapshot(kind: str) -> PopularSnapshot:
+    """
+    현재 집계 필드 기준으로 스냅샷 재생성 (update_popular_* 배치 끝에서 호출)
+    """
+    items = build_popular_items(kind)
+    snapshot, _ = PopularSnapshot.objects.update_or_create(
+        kind=kind,
+        defaults={
+            "isbns": [item["isbn"] for item in items],
+            "items": items,
+            "generated_at": timezone.now(),
+        },
+    )
+    transaction.on_commit(lambda: cache.delete_many([home_popular_cache_key(kind), popular_items_cache_key(kind)]))
+    return snapshot
+
+
+def popular_items(kind: str) -> list[dict]:
+    """
+    사용자와 무관한 인기 목록 항목 (조회 경로라 DB에 쓰지 않음)
+    trending: trending_score 인덱스로 바로 정렬
+    그 외: 배치(update_book_stats)가 만든 스냅샷 조회, 없으면 지금 집계 필드로 만들어 캐시에만 둠
+    (스냅샷 저장은 배치만 -> 동시에 들어온 첫 요청들이 서로 저장하다 충돌하지 않음)
+    """
+    if kind == TRENDING:
+        return build_popular_items(kind)
+    snapshot = PopularSnapshot.objects.filter(kind=kind).first()
+    if snapshot is not None:
+        return snapshot.items
+    return cache.get_or_set(
+        popular_items_cache_key(kind),
+        lambda: build_popular_items(kind),
+        POPULAR_ITEMS_CACHE_TIMEOUT,
+    )
+
+
+def with_user_flags(user, items: list[dict]) -> list[dict]:
+    """
+    사용자와 무관한 항목에 is_liked, is_wished만 덧씌움 (비로그인은 모두 False)
+    """
+    isbns = [item["isbn"] for item in items]
+    liked_isbn_set = set()
+    wished_isbn_set = set()
+    if isbns and user.is_authenticated:
+        liked_isbn_set = set(
+            UserBookLike.objects
+            .filter(user=user, book_id__in=isbns)
+            .values_list("book_id", flat=True)
+        )
+        wished_isbn_set = set(
+            Wishlist.objects
+            .filter(user=user, book_id__in=isbns)
+            .values_list("book_id", flat=True)
+        )
+
+    return [
+        {
+            **item,
+            "is_liked": item["isbn"] in liked_isbn_set,
+            "is_wished": item["isbn"] in wished_isbn_set,
+        }
+        for item in items
+    ]
+
+
+def invalidate_popular_snapshots(isbn: str):
+    """
+    도서 정보 변경/삭제 시 그 도서가 든 스냅샷 삭제 (다음 배치 전까지는 조회 때 만든 캐시 목록으로 응답)
+    스냅샷 없이 캐시에만 있는 목록은 도서 포함 여부를 모르므로 캐시는 종류별로 모두 지움
+    """
+    def _delete():
+        kinds = [
+            kind
+            for kind, isbns in PopularSnapshot.objects.values_list("kind", "isbns")
+            if isbn in isbns
+        ]
+        if kinds:
+            PopularSnapshot.objects.filter(kind__in=kinds).delete()
+        cache.delete_many([
+            key
+            for kind in PopularSnapshot.Kind.values
+            for key in (home_popular_cache_key(kind), popular_items_cache_key(kind))
+        ])
+
+    transaction.on_commit(_delete)
@@ -0,0 +1,333 @@
+import atexit
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .book_stats import record_daily_reads
+from .models import Book, UserBookHistory
+
+logger = logging.getLogger(__name__)
+
+FLUSH_FIELDS = ["current_location", "location_unit", "progress_percent", "last_read_at", "updated_at"]
+FLUSH_BATCH = 500
+
+# bookview_meta가 다른 워커에서 와도 최신 위치를 보도록 캐시에도 기록 (flush 주기보다 길게)
+PROGRESS_CACHE_TIMEOUT = 60 * 10
+
+# 프로세스마다 따로인 캐시: 다른 워커가 남긴 최신 위치를 볼 수 없으므로 버퍼를 쓰면 안 됨
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+# (user, isbn) -> history id / 마지막으로 읽기 수를 센 날짜 (워커 메모리, 넘치면 비움)
+KNOWN_KEYS_LIMIT = 100_000
+
+
+@dataclass
+class ProgressEntry:
+    history_id: int | None
+    location: int
+    location_unit: str
+    progress_percent: int
+    read_at: datetime
+
+    def as_cache_value(self) -> dict:
+        return {
+            "location": self.location,
+            "location_unit": self.location_unit,
+            "progress_percent": self.progress_percent,
+            "read_at": self.read_at,
+        }
+
+
+def progress_cache_key(user_id, isbn) -> str:
+    return f"progress:{user_id}:{isbn}"
+
+
+def pending_progress(user_id, isbn) -> dict | None:
+    """
+    아직 DB에 안 들어갔을 수 있는 최신 위치 (bookview_meta 등에서 DB 값 위에 덮어씀)
+    """
+    return cache.get(progress_cache_key(user_id, isbn))
+
+
+def publish_progress(user_id, isbn, entry: ProgressEntry):
+    cache.set(progress_cache_key(user_id, isbn), entry.as_cache_value(), PROGRESS_CACHE_TIMEOUT)
+
+
+class ProgressBuffer:
+    """
+    bookview_progress 쓰기 모음 버퍼.
+    - (user, isbn)마다 마지막 위치만 메모리에 두고 바로 응답
+    - PROGRESS_FLUSH_SECONDS마다 모인 것을 bulk_update 한 번으로 반영 (백그라운드 스레드)
+    - 프로세스 종료 시(atexit) 남은 것 반영. 비정상 종료 시 마지막 flush 이후 위치는 잃을 수 있음
+    """
+
+    def __init__(self, flush_seconds: float):
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._pending: dict[tuple, ProgressEntry] = {}
+        self._history_ids: dict[tuple, int] = {}
+        self._counted_days: dict[tuple, date] = {}
+        self._thread = None
+
+    # ---------- 요청 경로 ----------
+    def history_id(self, user_id, isbn) -> int | None:
+        return self._history_ids.get((user_id, isbn))
+
+    def remember_history(self, user_id, isbn, history_id):
+        if len(self._history_ids) >= KNOWN_KEYS_LIMIT:
+            self._history_ids.clear()
+        self._history_ids[(user_id, isbn)] = history_id
+
+    def needs_daily_count(self, user_id, isbn, now) -> bool:
+        """이 워커에서 오늘 이미 읽기 수 집계를 시도했으면 False (같은 날 반복 UPDATE 생략)"""
+        return self._counted_days.get((user_id, isbn)) != timezone.localdate(now)
+
+    def mark_daily_counted(self, user_id, isbn, now):
+        if len(self._counted_days) >= KNOWN_KEYS_LIMIT:
+            self._counted_days.clear()
+        self._counted_days[(user_id, isbn)] = timezone.localdate(now)
+
+    def record(self, user_id, isbn, entry: ProgressEntry):
+        with self._lock:
+            self._pending[(user_id, isbn)] = entry
+        publish_progress(user_id, isbn, entry)
+
+        if self.flush_seconds <= 0:
+            # 버퍼 끔 (PROGRESS_FLUSH_SECONDS=0 또는 공유 캐시 없음): 바로 반영
+            self.flush()
+            return
+        self._ensure_thread()
+
+    def discard(self, user_id, isbn, read_at):
+        """다른 경로(일괄 동기화)로 더 새 위치가 저장됐으면 이 워커의 이전 위치는 버림"""
+        with self._lock:
+            entry = self._pending.get((user_id, isbn))
+            if entry is not None and entry.read_at <= read_at:
+                del self._pending[(user_id, isbn)]
+
+    # ---------- flush ----------
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        # 다른 워커가 더 새 위치를 저장했으면(캐시의 read_at이 더 늦음) 덮어쓰지 않음
+        latest = cache.get_many([progress_cache_key(*key) for key in pending])
+        pending = {
+            key: entry
+            for key, entry in pending.items()
+            if latest.get(progress_cache_key(*key), {}).get("read_at", entry.read_at) <= entry.read_at
+        }
+
+        histories = {
+            key: UserBookHistory(
+                id=entry.history_id,
+                current_location=entry.location,
+                location_unit=entry.location_unit,
+                progress_percent=entry.progress_percent,
+                last_read_at=entry.read_at,
+                updated_at=entry.read_at,
+            )
+            for key, entry in pending.items()
+        }
+        try:
+            updated = UserBookHistory.objects.bulk_update(histories.values(), FLUSH_FIELDS, batch_size=FLUSH_BATCH)
+            if updated == len(histories):
+                return updated
+            # 그 사이 삭제된 history가 있음 -> 어느 행인지 행별로 확인
+        except Exception:
+            logger.exception("progress buffer bulk flush failed, falling back to per-row updates")
+
+        # 한 행 때문에 전체가 실패했을 수 있음 -> 행별로 저장하고, 실패한 행은 로그만 남기고 버림
+        # (다시 넣으면 같은 행 때문에 이후 flush가 계속 실패함)
+        saved = 0
+        for key, history in histories.items():
+            try:
+                if not self._save_row(history):
+                    self._recreate_row(key, history)
+                saved += 1
+            except Exception:
+                logger.exception("progress buffer dropped history %s", history.pk)
+        return saved
+
+    @staticmethod
+    def _save_row(history) -> int:
+        return UserBookHistory.objects.filter(pk=history.pk).update(
+            **{field: getattr(history, field) for field in FLUSH_FIELDS}
+        )
+
+    def _recreate_row(self, key, history):
+        """
+        기억해 둔 history가 삭제됨: 워커 메모리의 id를 버리고 (user, book) 행을 다시 확보해서 저장
+        """
+        user_id, isbn = key
+        with self._lock:
+            if self._history_ids.get(key) == history.pk:
+                del self._history_ids[key]
+        row, _ = UserBookHistory.objects.get_or_create(
+            user_id=user_id,
+            book_id=isbn,
+            defaults={"started_at": history.last_read_at},
+        )
+        history.pk = row.pk
+        self._save_row(history)
+        self.remember_history(user_id, isbn, row.pk)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="progress-buffer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        ticker = threading.Event()
+        while not ticker.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("progress buffer flush failed")
+            finally:
+                close_old_connections()
+
+
+def progress_flush_seconds() -> float:
+    """
+    PROGRESS_FLUSH_SECONDS. 단 기본 캐시가 프로세스별(LocMemCache 등)이면 0 (요청마다 바로 저장)
+    - 버퍼는 캐시로 워커 간 최신 위치를 맞추므로(pending_progress, flush 시 더 새 위치 확인)
+      캐시를 공유하지 않으면 다른 워커의 이전 위치가 나중에 flush되며 새 위치를 덮어씀
+    """
+    if settings.PROGRESS_FLUSH_SECONDS <= 0:
+        return 0
+    if settings.CACHES["default"]["BACKEND"] in PROCESS_LOCAL_CACHE_BACKENDS:
+        logger.info("progress buffer disabled: default cache is not shared between processes")
+        return 0
+    return settings.PROGRESS_FLUSH_SECONDS
+
+
+progress_buffer = ProgressBuffer(progress_flush_seconds())
+atexit.register(progress_buffer.flush)
+
+
+def _current_entry(history, cached) -> ProgressEntry:
+    """DB 값과 캐시(아직 반영 안 된 위치) 중 더 새 것"""
+    if cached and (history is None or history.last_read_at is None or cached["read_at"] >= history.last_read_at):
+        return ProgressEntry(
+            history_id=history.id if history else None,
+            location=cached["location"],
+            location_unit=cached["location_unit"],
+            progress_percent=cached["progress_percent"],
+            read_at=cached["read_at"],
+        )
+    return ProgressEntry(
+        history_id=history.id,
+        location=history.current_location,
+        location_unit=history.location_unit,
+        progress_percent=history.progress_percent,
+        read_at=history.last_read_at,
+    )
+
+
+def sync_progress(user_id, events, now) -> dict[str, tuple[bool, ProgressEntry]]:
+    """
+    오프라인에서 쌓인 읽기 위치 일괄 반영 (bookview_progress_batch).
+    events: (isbn, ProgressEntry) 목록, read_at은 클라이언트 시각
+
+    - 도서별로 read_at이 가장 늦은 이벤트만 남김 (last-writer-wins, 같으면 뒤의 것)
+    - DB나 버퍼(캐시)에 더 늦은 위치가 있으면 그 도서는 반영하지 않음
+    - 한 트랜잭션에서 history 조회 1번 + bulk_create/bulk_update
+    - 이벤트가 있는 날짜 중 마지막으로 센 날(last_counted_on) 이후의 날짜는 날짜별 첫 읽기로 집계 (record_daily_reads)
+
+    도서별 (반영 여부, 현재 최신 위치) 반환. 없는 도서는 결과에 없음
+    """
+    latest, first_read_on = {}, {}
+    for isbn, entry in events:
+        if isbn not in latest or entry.read_at >= latest[isbn].read_at:
+            latest[isbn] = entry
+        days = first_read_on.setdefault(isbn, {})
+        day = timezone.localdate(entry.read_at)
+        if day not in days or entry.read_at < days[day]:
+            days[day] = entry.read_at
+
+    isbns = set(Book.objects.filter(isbn__in=latest).values_list("isbn", flat=True))
+    cached = cache.get_many([progress_cache_key(user_id, isbn) for isbn in isbns])
+
+    results = {}
+    with transaction.atomic():
+        # 같은 (user, book) 행이 여러 개면 가장 먼저 만든 행 사용 (get_or_create와 같게)
+        histories = {
+            history.book_id: history
+            for history in (
+                UserBookHistory.objects
+                .select_for_update()
+                .filter(user_id=user_id, book_id__in=isbns)
+                .order_by("-id")
+            )
+        }
+
+        to_create, to_update, to_mark, reads = [], [], [], []
+        for isbn in isbns:
+            entry = latest[isbn]
+            history = histories.get(isbn)
+
+            last_day = history.last_counted_on if history else None
+            new_days = {day: read_at for day, read_at in first_read_on[isbn].items() if last_day is None or day > last_day}
+            reads += [(isbn, read_at) for read_at in new_days.values()]
+            if history is not None and new_days:
+                history.last_counted_on = max(new_days)
+                to_mark.append(history)
+
+            current = cached.get(progress_cache_key(user_id, isbn))
+            if history is not None or current:
+                current = _current_entry(history, current)
+                if current.read_at is not None and current.read_at >= entry.read_at:
+                    results[isbn] = (False, current)
+                    continue
+
+            if history is None:
+                history = UserBookHistory(
+                    user_id=user_id,
+                    book_id=isbn,
+                    started_at=min(first_read_on[isbn].values()),
+                    last_counted_on=max(new_days),
+                )
+                to_create.append(history)
+            else:
+                to_update.append(history)
+            history.current_location = entry.location
+            history.location_unit = entry.location_unit
+            history.progress_percent = entry.progress_percent
+            history.last_read_at = entry.read_at
+            history.updated_at = now
+            results[isbn] = (True, entry)
+
+        UserBookHistory.objects.bulk_create(to_create)
+        UserBookHistory.objects.bulk_update(to_update, FLUSH_FIELDS, batch_size=FLUSH_BATCH)
+        UserBookHistory.objects.bulk_update(to_mark, ["last_counted_on"], batch_size=FLUSH_BATCH)
+        record_daily_reads(reads, now)
+
+        for history in to_create + to_update:
+            results[history.book_id][1].history_id = history.id
+
+        def _after_commit():
+            # 캐시를 먼저 바꿔야 그 사이 flush가 이전 위치로 덮어쓰지 않음
+            for history in to_create + to_update:
+                entry = results[history.book_id][1]
+                publish_progress(user_id, history.book_id, entry)
+                progress_buffer.remember_history(user_id, history.book_id, history.id)
+                progress_buffer.discard(user_id, history.book_id, entry.read_at)
+
+        transaction.on_commit(_after_commit)
+
+    return results
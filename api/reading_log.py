@@ -0,0 +1,275 @@
+import glob
+import logging
+import os
+import socket
+import struct
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import NamedTuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Book, ReadingSessionSummary
+
+logger = logging.getLogger(__name__)
+
+# 읽기 이벤트 로그: 이벤트 발생 날짜(로컬)별, 프로세스별 파일에 고정 길이 레코드를 append만 함
+# 레코드 레이아웃 (little-endian, 40 bytes)
+#   int64  발생 시각 (UTC epoch microseconds)
+#   uint64 user id
+#   13s    isbn (ASCII, 짧으면 NUL 채움)
+#   uint8  이벤트 종류 (EVENT_*)
+#   uint8  location_unit 코드 (LOCATION_UNITS 순서)
+#   uint8  progress_percent (없으면 NO_PERCENT)
+#   uint32 location / 본문 조회 시작 위치
+#   uint32 본문 조회 끝 위치 (progress는 location과 같음)
+# 레이아웃이 바뀌면 LOG_VERSION을 올림 (파일 이름에 들어가므로 이전 파일과 섞이지 않음)
+LOG_VERSION = 1
+RECORD = struct.Struct("<qQ13sBBBII")
+RECORD_TS = struct.Struct("<q")
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+EVENT_PROGRESS = 1  # bookview_progress / 일괄 동기화
+EVENT_CONTENT = 2   # bookview_content (본문 구간 조회)
+
+LOCATION_UNITS = ("char", "page", "byte")
+NO_PERCENT = 0xFF
+MAX_LOCATION = 0xFFFFFFFF
+
+# 이보다 오래된 이벤트는 받지 않음 (일별 읽기 수 보관 기간 READ_DAILY_RETENTION_DAYS와 같음)
+EVENT_MAX_AGE = timedelta(days=90)
+
+# 같은 사용자-도서에서 이벤트 간격이 이보다 길면 다른 세션
+SESSION_GAP = timedelta(minutes=30)
+SUMMARY_BATCH = 1000
+READ_CHUNK_RECORDS = 4096
+
+
+class ReadingEvent(NamedTuple):
+    at: datetime
+    user_id: int
+    isbn: str
+    kind: int
+    location_unit: str
+    progress_percent: int | None
+    start: int
+    end: int
+
+
+def log_path(day, pid) -> str:
+    # 컨테이너끼리 로그 디렉터리를 공유하면 pid가 겹칠 수 있어서 호스트 이름도 넣음
+    return os.path.join(settings.READING_LOG_ROOT, f"{day.isoformat()}.{socket.gethostname()}-{pid}.v{LOG_VERSION}.log")
+
+
+def log_paths(day) -> list[str]:
+    """그날 모든 프로세스가 쓴 로그 파일"""
+    return sorted(glob.glob(os.path.join(settings.READING_LOG_ROOT, f"{day.isoformat()}.*.v{LOG_VERSION}.log")))
+
+
+def _pack(at, user_id, isbn, kind, location_unit, progress_percent, start, end) -> bytes:
+    return RECORD.pack(
+        int((at - EPOCH) / timedelta(microseconds=1)),
+        user_id,
+        isbn.encode("ascii", "replace")[:13],
+        kind,
+        LOCATION_UNITS.index(location_unit) if location_unit in LOCATION_UNITS else 0,
+        NO_PERCENT if progress_percent is None else max(0, min(int(progress_percent), 100)),
+        max(0, min(start, MAX_LOCATION)),
+        max(0, min(end, MAX_LOCATION)),
+    )
+
+
+def progress_record(user_id, isbn, location, location_unit, progress_percent, at) -> bytes:
+    return _pack(at, user_id, isbn, EVENT_PROGRESS, location_unit, progress_percent, location, location)
+
+
+def content_record(user_id, isbn, start, end, at) -> bytes:
+    return _pack(at, user_id, isbn, EVENT_CONTENT, "char", None, start, end)
+
+
+def record_day(record: bytes):
+    """레코드가 들어갈 파일 날짜 = 이벤트 발생 시각의 로컬 날짜"""
+    return timezone.localdate(EPOCH + timedelta(microseconds=RECORD_TS.unpack_from(record)[0]))
+
+
+class ReadingLog:
+    """
+    프로세스마다 자기 오늘 파일을 O_APPEND로 열어 두고 레코드를 write() 한 번으로 붙임
+    - 레코드는 발생 시각 날짜의 파일로 감 (오프라인 일괄 동기화의 지난 이벤트는 그날 파일에 따로 씀)
+    - 파일을 프로세스별로 나눠서 쓰는 쪽이 하나뿐 -> 비정상 종료로 덜 쓰인 레코드는
+      다시 열 때(같은 호스트/pid 재사용) 잘라내면 되고, 다른 프로세스 레코드 정렬이 어긋나지 않음
+    - 로그를 못 써도 요청은 실패시키지 않음
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fd = None
+        self._day = None
+        self._pid = None
+
+    @staticmethod
+    def _open_file(day, pid) -> int:
+        os.makedirs(settings.READING_LOG_ROOT, exist_ok=True)
+        fd = os.open(log_path(day, pid), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        torn = os.fstat(fd).st_size % RECORD.size
+        if torn:
+            os.ftruncate(fd, os.fstat(fd).st_size - torn)
+        return fd
+
+    def _open(self, day) -> int:
+        pid = os.getpid()
+        if self._fd is not None and self._day == day and self._pid == pid:
+            return self._fd
+        if self._fd is not None and self._pid == pid:
+            os.close(self._fd)
+        self._fd = self._open_file(day, pid)
+        self._day, self._pid = day, pid
+        return self._fd
+
+    def _write(self, day, data: bytes):
+        if day == timezone.localdate():
+            os.write(self._open(day), data)
+            return
+        # 오늘이 아닌 날짜(일괄 동기화의 지난 이벤트)는 열어 둔 오늘 파일을 바꾸지 않고 한 번만 열어 씀
+        fd = self._open_file(day, os.getpid())
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def append(self, *records: bytes):
+        if not records:
+            return
+        # 보관 기간(EVENT_MAX_AGE) 밖 날짜는 버림 (날짜마다 파일이 생기므로 범위를 제한)
+        today = timezone.localdate()
+        oldest = today - timedelta(days=EVENT_MAX_AGE.days)
+        by_day = defaultdict(list)
+        dropped = 0
+        for record in records:
+            try:
+                day = record_day(record)
+            except (OverflowError, ValueError):
+                day = None
+            if day is not None and oldest <= day <= today:
+                by_day[day].append(record)
+            else:
+                dropped += 1
+        if dropped:
+            logger.warning("reading log dropped %d records outside retention", dropped)
+        try:
+            with self._lock:
+                for day, day_records in by_day.items():
+                    self._write(day, b"".join(day_records))
+        except OSError:
+            logger.warning("reading log append failed", exc_info=True)
+
+
+reading_log = ReadingLog()
+
+
+def _iter_file(path):
+    """로그 파일 하나를 순서대로 읽음. 마지막에 덜 쓰인 레코드(비정상 종료)는 버림"""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(RECORD.size * READ_CHUNK_RECORDS)
+            if not chunk:
+                break
+            usable = len(chunk) - len(chunk) % RECORD.size
+            for ts_us, user_id, isbn, kind, unit, percent, start, end in RECORD.iter_unpack(chunk[:usable]):
+                yield ReadingEvent(
+                    at=EPOCH + timedelta(microseconds=ts_us),
+                    user_id=user_id,
+                    isbn=isbn.rstrip(b"\0").decode("ascii"),
+                    kind=kind,
+                    location_unit=LOCATION_UNITS[unit] if unit < len(LOCATION_UNITS) else "char",
+                    progress_percent=None if percent == NO_PERCENT else percent,
+                    start=start,
+                    end=end,
+                )
+            if usable < len(chunk):
+                break
+
+
+def iter_log(day):
+    """하루치 로그 레코드 (파일별 순서, 파일 간 순서는 보장 안 함)"""
+    for path in log_paths(day):
+        yield from _iter_file(path)
+
+
+def _summarize(user_id, isbn, day, events) -> ReadingSessionSummary:
+    progress = [e for e in events if e.kind == EVENT_PROGRESS]
+    content = [e for e in events if e.kind == EVENT_CONTENT]
+
+    if progress:
+        first, last = progress[0], progress[-1]
+        location_unit = last.location_unit
+        start_location, end_location = first.start, last.start
+        start_percent, end_percent = first.progress_percent, last.progress_percent
+    else:
+        # 본문만 받아 가고 위치는 안 보낸 세션: 조회 구간으로 대신함
+        location_unit = "char"
+        start_location, end_location = content[0].start, content[-1].end
+        start_percent = end_percent = None
+
+    return ReadingSessionSummary(
+        user_id=user_id,
+        book_id=isbn,
+        day=day,
+        started_at=events[0].at,
+        ended_at=events[-1].at,
+        duration_seconds=int((events[-1].at - events[0].at).total_seconds()),
+        progress_events=len(progress),
+        content_requests=len(content),
+        location_unit=location_unit,
+        start_location=start_location,
+        end_location=end_location,
+        start_percent=start_percent,
+        end_percent=end_percent,
+    )
+
+
+def compact_day(day, session_gap=SESSION_GAP) -> tuple[int, int]:
+    """
+    하루치 로그를 사용자-도서별 세션으로 묶어 ReadingSessionSummary에 저장.
+    - 같은 사용자-도서에서 이벤트 간격이 session_gap보다 길면 새 세션
+    - 그 날짜 요약을 지우고 다시 쓰므로 여러 번 돌려도 결과가 같음 (진행 중인 오늘 파일도 가능)
+    - 레코드는 발생 시각 날짜 파일에 있으므로 자정을 넘긴 세션은 날짜별로 따로 집계됨
+    - 오프라인 일괄 동기화로 지난 날짜 이벤트가 나중에 들어오면 그 날짜를 다시 압축해야 반영됨
+    - 그 사이 삭제된 사용자/도서의 이벤트는 버림
+    (읽은 이벤트 수, 만든 세션 수) 반환
+    """
+    by_key = defaultdict(list)
+    count = 0
+    for event in iter_log(day):
+        by_key[(event.user_id, event.isbn)].append(event)
+        count += 1
+
+    user_ids = set(
+        get_user_model().objects
+        .filter(id__in={user_id for user_id, _ in by_key})
+        .values_list("id", flat=True)
+    )
+    isbns = set(Book.objects.filter(isbn__in={isbn for _, isbn in by_key}).values_list("isbn", flat=True))
+
+    summaries = []
+    for (user_id, isbn), events in by_key.items():
+        if user_id not in user_ids or isbn not in isbns:
+            continue
+        events.sort(key=lambda e: e.at)
+        session = [events[0]]
+        for event in events[1:]:
+            if event.at - session[-1].at > session_gap:
+                summaries.append(_summarize(user_id, isbn, day, session))
+                session = []
+            session.append(event)
+        summaries.append(_summarize(user_id, isbn, day, session))
+
+    with transaction.atomic():
+        ReadingSessionSummary.objects.filter(day=day).delete()
+        ReadingSessionSummary.objects.bulk_create(summaries, batch_size=SUMMARY_BATCH)
+
+    return count, len(summaries)
@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import UserBookHistory
+
+# 정책값: 30일 미접속/미열람이면 중단 처리
+READING_INACTIVE_DAYS = 30
+# 안전장치: 시작한지 3일 이내는 중단 제외
+READING_MIN_DAYS_BEFORE_STOP = 3
+
+
+def stale_reading_q(now=None, inactive_days=READING_INACTIVE_DAYS, min_days_before_stop=READING_MIN_DAYS_BEFORE_STOP) -> Q:
+    """
+    READING인데 오래 활동이 없어 STOPPED로 바꿀 기록 조건
+    - last_read_at이 있으면 last_read_at 기준, 없으면 started_at 기준으로 inactive_days 이상 지남
+    - started_at이 min_days_before_stop일 이내면 제외
+    """
+    now = now or timezone.now()
+    stop_cutoff = now - timedelta(days=inactive_days)
+    min_started_cutoff = now - timedelta(days=min_days_before_stop)
+
+    return Q(started_at__lte=min_started_cutoff) & (
+        Q(last_read_at__lte=stop_cutoff)
+        | Q(last_read_at__isnull=True, started_at__lte=stop_cutoff)
+    )
+
+
+def stop_stale_reading(now=None, inactive_days=READING_INACTIVE_DAYS, min_days_before_stop=READING_MIN_DAYS_BEFORE_STOP) -> int:
+    """
+    전체 사용자의 오래된 READING 기록을 UPDATE 한 번으로 STOPPED 처리 (stop_stale_reading 배치).
+    last_read_at 조건은 ubh_reading_last_read_idx (READING 행만 든 부분 인덱스)로 찾음
+    바뀐 행 수 반환
+    """
+    now = now or timezone.now()
+    return (
+        UserBookHistory.objects
+        .filter(status=UserBookHistory.Status.READING)
+        .filter(stale_reading_q(now, inactive_days, min_days_before_stop))
+        .update(status=UserBookHistory.Status.STOPPED, updated_at=now)
+    )
+
+
+def current_reading_history(user):
+    """
+    지금 읽는 책: READING 중 last_read_at 최신 1권, 동률이면 started_at
+    오래된 READING은 stop_stale_reading 배치가 STOPPED로 바꾸고,
+    배치가 돌기 전이라도 같은 조건으로 제외 (쿼리 1번, (user, status, -last_read_at) 인덱스)
+    """
+    return (
+        UserBookHistory.objects
+        .select_related("book")
+        .filter(user=user, status=UserBookHistory.Status.READING)
+        .exclude(stale_reading_q())
+        .order_by("-last_read_at", "-started_at", "-id")
+        .first()
+    )
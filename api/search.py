@@ -0,0 +1,217 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .caches import invalidate_search_results
+from .models import AuthorsBook, Book
+
+FTS_TABLE = "api_book_fts"
+FTS_COLUMNS = ("isbn", "title", "subtitle", "publisher", "authors", "initials")
+TEXT_COLUMNS = "{title subtitle publisher authors}"
+INSERT_SQL = (
+    f"INSERT INTO {FTS_TABLE} ({', '.join(FTS_COLUMNS)}) "
+    f"VALUES ({', '.join(['%s'] * len(FTS_COLUMNS))})"
+)
+
+# bm25 컬럼 가중치 (isbn, title, subtitle, publisher, authors, initials)
+FTS_WEIGHTS = (0.0, 10.0, 4.0, 2.0, 6.0, 3.0)
+
+# 초성 검색용: 한글 음절(가~힣)의 초성 19자 (호환 자모)
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+HANGUL_BASE, HANGUL_LAST = 0xAC00, 0xD7A3
+JUNGSUNG_JONGSUNG = 21 * 28
+
+_NON_WORD = re.compile(r"[\W_]+")
+_CHOSUNG_ONLY = re.compile(f"[{CHOSUNG}]+")
+
+
+def compact_text(text) -> str:
+    """NFC 정규화 + 소문자 + 공백/문장부호 제거 ("해리 포터" == "해리포터")"""
+    return _NON_WORD.sub("", unicodedata.normalize("NFC", str(text or "")).lower())
+
+
+def to_chosung(text) -> str:
+    """
+    한글 음절은 초성으로, 나머지 글자(영문/숫자/자모)는 그대로: "해리 포터 2" -> "ㅎㄹㅍㅌ2"
+    """
+    out = []
+    for ch in compact_text(text):
+        code = ord(ch)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            out.append(CHOSUNG[(code - HANGUL_BASE) // JUNGSUNG_JONGSUNG])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def bigram_tokens(*values) -> str:
+    """
+    색인용 토큰열: 값마다 글자 bigram + 마지막 글자 1개.
+    "해리포터" -> "해리 리포 포터 터"
+    - 검색어 bigram을 phrase로 찾으면 연속된 부분 문자열 매칭이 됨 (띄어쓰기/어절 경계 무관)
+    - 값 끝의 1글자 토큰은 bigram과 길이가 달라 phrase가 값 경계를 넘어 이어지지 않음
+      (여러 작가 이름을 한 컬럼에 넣어도 "작가A 끝 + 작가B 앞"으로 매칭되지 않음)
+    """
+    tokens = []
+    for value in values:
+        if not value:
+            continue
+        tokens.extend(value[i:i + 2] for i in range(len(value) - 1))
+        tokens.append(value[-1])
+    return " ".join(tokens)
+
+
+def index_document(isbn, title, subtitle, publisher, author_names) -> tuple:
+    """FTS 테이블 1행 (FTS_COLUMNS 순서)"""
+    return (
+        isbn,
+        bigram_tokens(compact_text(title)),
+        bigram_tokens(compact_text(subtitle)),
+        bigram_tokens(compact_text(publisher)),
+        bigram_tokens(*(compact_text(name) for name in author_names)),
+        bigram_tokens(to_chosung(title), *(to_chosung(name) for name in author_names)),
+    )
+
+
+def _phrase(value: str) -> str:
+    """검색어 1단어 -> bigram phrase (1글자면 그 글자로 시작하는 토큰 prefix 매칭)"""
+    if len(value) == 1:
+        return f'"{value}"*'
+    return '"' + " ".join(value[i:i + 2] for i in range(len(value) - 1)) + '"'
+
+
+class BaseSearchBackend:
+    """
+    도서 검색 인덱스 인터페이스.
+    search()는 순위대로 정렬된 ISBN 리스트만 반환하고, 도서 정보 조립은 호출하는 쪽에서 한다.
+    """
+
+    def search(self, query: str, limit: int) -> list[str]:
+        raise NotImplementedError
+
+    def index_books(self, isbns):
+        """도서 생성/수정 시 해당 도서들의 인덱스 갱신 (삭제된 도서는 인덱스에서 제거)"""
+
+    def rebuild(self):
+        """인덱스 전체 재생성"""
+
+
+class IcontainsSearchBackend(BaseSearchBackend):
+    """
+    별도 인덱스 없이 DB에서 바로 찾는 방식 (SQLite가 아닌 DB용 기본 구현)
+    """
+
+    def search(self, query, limit):
+        return list(
+            Book.objects
+            .filter(
+                Q(title__icontains=query) |
+                Q(subtitle__icontains=query) |
+                Q(publisher__icontains=query) |
+                Q(authors_book_list__author__name__icontains=query)
+            )
+            .distinct()
+            .order_by("-like_count", "title")
+            .values_list("isbn", flat=True)[:limit]
+        )
+
+
+class SQLiteFTSSearchBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 가상 테이블(api_book_fts) 기반 검색.
+    - 컬럼에는 원문 대신 글자 bigram 토큰열을 저장 (index_document)
+      -> 한국어처럼 띄어쓰기/조사가 붙는 텍스트도 부분 문자열로 찾음 ("포터와" 안의 "포터")
+    - 검색어는 공백 기준 단어마다 bigram phrase로 바꾸고 AND로 묶음
+    - 초성으로만 된 단어("ㅎㄹ")는 initials 컬럼(제목/작가 초성)에서 찾음
+    - bm25(컬럼 가중치) 순, 동점이면 like_count 순
+    테이블은 migration 0013(생성), 0014(bigram/초성 컬럼으로 재생성)에서 만든다.
+    """
+
+    @staticmethod
+    def _match_expr(query: str) -> str:
+        # 토큰은 글자만 남기고 따옴표로 감싸므로 FTS5 문법 문자가 그대로 넘어가지 않음
+        clauses = []
+        for word in query.split():
+            if _CHOSUNG_ONLY.fullmatch(word):
+                clauses.append(f"initials : {_phrase(word)}")
+                continue
+            value = compact_text(word)
+            if value:
+                clauses.append(f"{TEXT_COLUMNS} : {_phrase(value)}")
+        return " AND ".join(clauses)
+
+    def search(self, query, limit):
+        match = self._match_expr(query)
+        if not match:
+            return []
+
+        weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT f.isbn
+                FROM {FTS_TABLE} AS f
+                JOIN api_book AS b ON b.isbn = f.isbn
+                WHERE {FTS_TABLE} MATCH %s
+                ORDER BY bm25({FTS_TABLE}, {weights}), b.like_count DESC, b.title
+                LIMIT %s
+                """,
+                [match, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def _documents(isbns=None):
+        """
+        색인할 도서들의 FTS 행 생성 (index_document)
+        """
+        books = Book.objects.all()
+        authors_qs = AuthorsBook.objects.all()
+        if isbns is not None:
+            books = books.filter(isbn__in=isbns)
+            authors_qs = authors_qs.filter(book_id__in=isbns)
+
+        author_names = {}
+        for book_id, name in authors_qs.values_list("book_id", "author__name"):
+            author_names.setdefault(book_id, []).append(name)
+
+        for isbn, title, subtitle, publisher in books.values_list("isbn", "title", "subtitle", "publisher"):
+            yield index_document(isbn, title, subtitle, publisher, author_names.get(isbn, []))
+
+    def index_books(self, isbns):
+        isbns = list(isbns)
+        if not isbns:
+            return
+        placeholders = ", ".join(["%s"] * len(isbns))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE isbn IN ({placeholders})", isbns)
+            cursor.executemany(INSERT_SQL, list(self._documents(isbns)))
+
+    def rebuild(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.executemany(INSERT_SQL, list(self._documents()))
+
+
+@lru_cache(maxsize=1)
+def get_search_backend() -> BaseSearchBackend:
+    return import_string(settings.BOOK_SEARCH_BACKEND)()
+
+
+def reindex_books(*isbns):
+    """
+    도서/작가 변경 시 호출. 트랜잭션 안이면 커밋 후에 반영
+    """
+    isbns = {isbn for isbn in isbns if isbn}
+    if isbns:
+        transaction.on_commit(lambda: _index_and_invalidate(isbns))
+
+
+def _index_and_invalidate(isbns):
+    get_search_backend().index_books(isbns)
+    invalidate_search_results()
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .autocomplete import autocomplete_index
+from .caches import invalidate_book_detail, invalidate_book_detail_for_commenter
+from .facets import facet_index
+from .models import Author, AuthorsBook, Book, Tag
+from .popular import POPULAR_FIELDS, invalidate_popular_snapshots
+from .search import reindex_books
+
+# 검색 인덱스에 들어가는 Book 필드 (이 필드가 안 바뀐 save는 재색인 생략)
+SEARCH_FIELDS = {"title", "subtitle", "publisher"}
+
+# 검색 필터 facet 인덱스에 들어가는 Book 필드
+FACET_FIELDS = {"published_date", "genre", "lang", "top_tags"}
+
+# 자동완성 항목에 들어가는 Book 필드
+# (삭제 후에는 instance pk가 None이 되므로 on_commit 콜백에는 값을 미리 묶어서 넘김)
+AUTOCOMPLETE_FIELDS = {"title", "cover_image"}
+
+# 도서 상세 코멘트 목록에 들어가는 사용자 필드
+COMMENTER_FIELDS = {"nickname", "profile_image"}
+
+
+# 관리자/배치에서 도서 메타(제목, 설명, top_tags 등)나 작가 정보가 바뀌면 상세 캐시 무효화
+@receiver([post_save, post_delete], sender=Book)
+def book_changed(sender, instance, **kwargs):
+    invalidate_book_detail(instance.isbn)
+
+    update_fields = kwargs.get("update_fields")
+    if update_fields is None or SEARCH_FIELDS & set(update_fields):
+        reindex_books(instance.isbn)
+    if update_fields is None or AUTOCOMPLETE_FIELDS & set(update_fields):
+        transaction.on_commit(lambda isbn=instance.isbn: autocomplete_index.refresh_books([isbn]))
+    if update_fields is None or FACET_FIELDS & set(update_fields):
+        transaction.on_commit(facet_index.mark_stale)
+    if update_fields is None or POPULAR_FIELDS & set(update_fields):
+        invalidate_popular_snapshots(instance.isbn)
+
+
+@receiver([post_save, post_delete], sender=AuthorsBook)
+def authors_book_changed(sender, instance, **kwargs):
+    invalidate_book_detail(instance.book_id)
+    reindex_books(instance.book_id)
+    transaction.on_commit(lambda author_id=instance.author_id: autocomplete_index.refresh_authors([author_id]))
+
+
+@receiver(post_save, sender=Author)
+def author_changed(sender, instance, created, **kwargs):
+    transaction.on_commit(lambda author_id=instance.id: autocomplete_index.refresh_authors([author_id]))
+    if created:
+        return
+    isbns = list(instance.authors_book_list.values_list("book_id", flat=True))
+    invalidate_book_detail(*isbns)
+    reindex_books(*isbns)
+
+
+@receiver(post_delete, sender=Author)
+def author_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda author_id=instance.id: autocomplete_index.refresh_authors([author_id]))
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda tag_id=instance.id: autocomplete_index.refresh_tags([tag_id]))
+
+
+# 닉네임/프로필 이미지가 바뀌면 그 사용자가 코멘트를 남긴 책들의 상세 캐시 무효화 (어느 경로로 저장하든)
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, created, **kwargs):
+    if created:
+        return
+    update_fields = kwargs.get("update_fields")
+    if update_fields is None or COMMENTER_FIELDS & set(update_fields):
+        invalidate_book_detail_for_commenter(instance)
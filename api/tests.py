@@ -1,3 +1,413 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import timedelta
+from unittest import skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .ingestion import claim_next_task
+from .models import (
+    Author, AuthorsBook, Book, BookIngestTask, BookReadDaily, PopularSnapshot, UserBookHistory, UserBookLike,
+)
+from .popular import TRENDING, popular_books_qs
+from .progress_buffer import progress_buffer
+from .reading_status import stale_reading_q
+from .search import get_search_backend
+from .trending import trending_increment
+
+User = get_user_model()
+
+
+class BooksSearchQueryCountTests(TestCase):
+    """
+    books_search는 "ISBN 찾기 -> 한 번에 채우기" 2단계라 결과 수와 무관하게 쿼리 수가 고정
+    (검색 1 + 도서 in_bulk 1 + 작가 1, 로그인 시 좋아요 1)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="reader", nickname="reader")
+        author = Author.objects.create(name="한강", bio="")
+        for i in range(5):
+            book = Book.objects.create(
+                isbn=f"97800000000{i:02d}",
+                title=f"소년이 온다 {i}",
+                publisher="창비",
+                published_date="2020-01-01",
+                page_count=10,
+                lang="ko",
+                toc=[],
+            )
+            AuthorsBook.objects.create(book=book, author=author)
+            if i % 2 == 0:
+                UserBookLike.objects.create(user=cls.user, book=book)
+
+        # 테스트 트랜잭션 안에서는 on_commit 재색인이 돌지 않으므로 직접 생성
+        get_search_backend().rebuild()
+
+    def setUp(self):
+        # 검색 결과 캐시가 있으면 검색 쿼리가 빠지므로 매번 비움
+        cache.clear()
+        self.client = APIClient()
+
+    def test_anonymous_search_query_count(self):
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/books/search/", {"q": "소년"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["items"]), 5)
+        self.assertFalse(any(item["is_liked"] for item in response.data["items"]))
+
+    def test_authenticated_search_query_count(self):
+        self.client.force_authenticate(self.user)
+        with self.assertNumQueries(4):
+            response = self.client.get("/api/books/search/", {"q": "소년"})
+        self.assertEqual(response.status_code, 200)
+        liked = {item["isbn"] for item in response.data["items"] if item["is_liked"]}
+        self.assertEqual(liked, {"9780000000000", "9780000000002", "9780000000004"})
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN 형식은 SQLite 기준")
+class PopularIndexPlanTests(TestCase):
+    """
+    인기 목록 / 오래된 READING 정리 쿼리가 0018_popular_indexes의 인덱스를 타는지 실행 계획으로 확인
+    (정렬도 인덱스 순서로 읽어야 하므로 TEMP B-TREE가 없어야 함)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        books = [
+            Book(
+                isbn=f"979{i:010d}",
+                title=f"책 {i}",
+                publisher="창비",
+                published_date="2020-01-01",
+                page_count=10,
+                lang="ko",
+                toc=[],
+                readed_num_week=i % 7,
+                readed_num_month=i % 31,
+                is_steady=i % 10 == 0,
+                like_count=i % 13,
+                trending_score=float(i % 5),
+            )
+            for i in range(300)
+        ]
+        Book.objects.bulk_create(books)
+
+        users = [User.objects.create(username=f"reader{i}") for i in range(10)]
+        UserBookHistory.objects.bulk_create([
+            UserBookHistory(
+                user=users[i % len(users)],
+                book=books[i],
+                started_at=now - timedelta(days=i % 90),
+                last_read_at=None if i % 11 == 0 else now - timedelta(days=i % 60),
+                status=UserBookHistory.Status.READING if i % 3 else UserBookHistory.Status.FINISHED,
+            )
+            for i in range(300)
+        ])
+
+    def plan(self, qs) -> str:
+        sql, params = qs.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return "\n".join(row[-1] for row in cursor.fetchall())
+
+    def assertPlanUsesIndex(self, qs, index_name):
+        plan = self.plan(qs)
+        self.assertIn(f"USING INDEX {index_name}", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_weekly_uses_partial_index(self):
+        self.assertPlanUsesIndex(popular_books_qs(PopularSnapshot.Kind.WEEKLY)[:30], "book_popular_week_idx")
+
+    def test_monthly_uses_partial_index(self):
+        self.assertPlanUsesIndex(popular_books_qs(PopularSnapshot.Kind.MONTHLY)[:30], "book_popular_month_idx")
+
+    def test_steady_uses_partial_index(self):
+        self.assertPlanUsesIndex(popular_books_qs(PopularSnapshot.Kind.STEADY)[:30], "book_steady_idx")
+
+    def test_trending_uses_score_index(self):
+        self.assertPlanUsesIndex(popular_books_qs(TRENDING)[:30], "api_book_trending_score")
+
+    def test_stop_stale_reading_uses_partial_index(self):
+        qs = (
+            UserBookHistory.objects
+            .filter(status=UserBookHistory.Status.READING)
+            .filter(stale_reading_q())
+        )
+        self.assertIn("USING INDEX ubh_reading_last_read_idx", self.plan(qs))
+
+
+@override_settings(READING_LOG_ROOT=tempfile.mkdtemp(prefix="reading_logs_test_"))
+class DailyReadCountTests(TestCase):
+    """일별 읽기 수는 사용자-도서-날짜당 1회 (코멘트 작성 등 다른 쓰기와 무관)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="reader", nickname="reader")
+        cls.book = Book.objects.create(
+            isbn="9780000000001",
+            title="작별하지 않는다",
+            publisher="문학동네",
+            published_date="2021-09-09",
+            page_count=10,
+            lang="ko",
+            toc=[],
+        )
+
+    def setUp(self):
+        cache.clear()
+        # 워커 메모리(history id / 오늘 센 날짜)가 테스트 사이에 남지 않도록
+        progress_buffer._history_ids.clear()
+        progress_buffer._counted_days.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def progress(self, location):
+        response = self.client.post(
+            f"/api/bookviews/{self.book.isbn}/progress/",
+            {"location": location, "location_unit": "char", "progress_percent": 1},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def today_count(self):
+        bucket = BookReadDaily.objects.filter(book=self.book, day=timezone.localdate()).first()
+        return bucket.count if bucket else 0
+
+    def test_read_after_comment_is_counted(self):
+        response = self.client.post(f"/api/books/{self.book.isbn}/comment/", {"content": "좋았어요"}, format="json")
+        self.assertEqual(response.status_code, 201)
+
+        self.progress(10)
+        self.assertEqual(self.today_count(), 1)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.readed_num_week, 1)
+
+    def test_progress_after_history_deleted_is_saved(self):
+        self.progress(10)
+        UserBookHistory.objects.filter(user=self.user, book=self.book).delete()
+
+        # 워커는 삭제된 history id를 기억하고 있음 -> flush에서 행을 다시 만들어 저장
+        self.progress(20)
+        history = UserBookHistory.objects.get(user=self.user, book=self.book)
+        self.assertEqual(history.current_location, 20)
+        self.assertEqual(progress_buffer.history_id(self.user.id, self.book.isbn), history.id)
+
+    def test_same_day_counted_once(self):
+        self.progress(10)
+        # 다른 워커(메모리 기록 없음)에서 온 요청이어도 다시 세지 않음
+        progress_buffer._counted_days.clear()
+        self.progress(20)
+        self.assertEqual(self.today_count(), 1)
+
+
+class CommentTrendingTests(TestCase):
+    """코멘트 작성 후 삭제하면 트렌딩 점수가 원래대로 (반복해도 오르지 않음)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="reader", nickname="reader")
+        cls.book = Book.objects.create(
+            isbn="9780000000001",
+            title="희랍어 시간",
+            publisher="문학동네",
+            published_date="2011-11-15",
+            page_count=10,
+            lang="ko",
+            toc=[],
+            # 저장값은 기준 시각 대비 커지는 가중치라 지금 읽기 5건 정도의 값으로 시작
+            trending_score=5 * trending_increment("read"),
+        )
+        cls.initial_score = cls.book.trending_score
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_create_then_delete_restores_score(self):
+        for _ in range(3):
+            response = self.client.post(f"/api/books/{self.book.isbn}/comment/", {"content": "좋았어요"}, format="json")
+            self.assertEqual(response.status_code, 201)
+            comment_id = UserBookHistory.objects.get(user=self.user, book=self.book).id
+            response = self.client.delete(f"/api/books/{self.book.isbn}/comment/{comment_id}/delete/")
+            self.assertEqual(response.status_code, 200)
+
+        self.book.refresh_from_db()
+        self.assertAlmostEqual(self.book.trending_score / self.initial_score, 1.0)
+        self.assertEqual(self.book.comment_count, 0)
+
+
+@override_settings(READING_LOG_ROOT=tempfile.mkdtemp(prefix="reading_logs_test_"))
+class ProgressBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="reader", nickname="reader")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, *events):
+        return self.client.post("/api/bookviews/progress/batch/", {"events": list(events)}, format="json")
+
+    def event(self, isbn, client_timestamp):
+        return {
+            "isbn": isbn,
+            "location": 10,
+            "location_unit": "char",
+            "progress_percent": 1,
+            "client_timestamp": client_timestamp,
+        }
+
+    def test_rejects_timestamp_older_than_retention(self):
+        for ts in ("0001-01-01T00:00:00+00:00", (timezone.now() - timedelta(days=365)).isoformat()):
+            response = self.post(self.event("9780000000001", ts))
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data["error"]["field"], "client_timestamp")
+
+    def test_unknown_isbn_is_not_logged(self):
+        response = self.post(self.event("9789999999999", (timezone.now() - timedelta(days=3)).isoformat()))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["not_found"], ["9789999999999"])
+        self.assertEqual(os.listdir(settings.READING_LOG_ROOT), [])
+
+
+@override_settings(READING_LOG_ROOT=tempfile.mkdtemp(prefix="reading_logs_test_"))
+class BookDetailCommentsTests(TestCase):
+    """상세 코멘트 목록은 작성 시각 순이고, 작성자 프로필이 바뀌면 캐시가 지워짐"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = Book.objects.create(
+            isbn="9780000000001",
+            title="흰",
+            publisher="문학동네",
+            published_date="2018-04-25",
+            page_count=10,
+            lang="ko",
+            toc=[],
+        )
+        cls.first = User.objects.create(username="first", nickname="first")
+        cls.second = User.objects.create(username="second", nickname="second")
+
+    def setUp(self):
+        cache.clear()
+        progress_buffer._history_ids.clear()
+        progress_buffer._counted_days.clear()
+        self.client = APIClient()
+        for user in (self.first, self.second):
+            self.client.force_authenticate(user)
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(f"/api/books/{self.book.isbn}/comment/", {"content": "좋아요"}, format="json")
+            self.assertEqual(response.status_code, 201)
+        self.client.force_authenticate(None)
+
+    def comment_users(self):
+        response = self.client.get(f"/api/books/{self.book.isbn}/")
+        self.assertEqual(response.status_code, 200)
+        return [(c["user"]["nickname"], c["user"]["profile_image"]) for c in response.data["book"]["comments"]]
+
+    def test_reading_does_not_reorder_comments(self):
+        self.assertEqual([name for name, _ in self.comment_users()], ["second", "first"])
+
+        self.client.force_authenticate(self.first)
+        response = self.client.post(
+            f"/api/bookviews/{self.book.isbn}/progress/",
+            {"location": 10, "location_unit": "char", "progress_percent": 1},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.client.force_authenticate(None)
+
+        cache.clear()
+        self.assertEqual([name for name, _ in self.comment_users()], ["second", "first"])
+
+    def test_profile_image_change_invalidates_cache(self):
+        self.comment_users()  # 캐시 채움
+
+        self.first.profile_image = "https://example.com/first.png"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.save(update_fields=["profile_image"])
+
+        self.assertIn(("first", "https://example.com/first.png"), self.comment_users())
+
+
+class PopularItemsTests(TestCase):
+    """스냅샷이 없을 때 인기 목록 조회는 DB에 쓰지 않고 캐시에만 만들어 둠"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(3):
+            Book.objects.create(
+                isbn=f"97800000001{i:02d}",
+                title=f"작별하지 않는다 {i}",
+                publisher="문학동네",
+                published_date="2021-09-09",
+                page_count=10,
+                lang="ko",
+                toc=[],
+                readed_num_week=i + 1,
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_cold_request_does_not_write_snapshot(self):
+        response = self.client.get("/api/books/popular/", {"q": "weekly"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["isbn"] for item in response.data["items"]],
+                         ["9780000000102", "9780000000101", "9780000000100"])
+        self.assertFalse(PopularSnapshot.objects.exists())
+
+        # 두 번째 요청은 캐시에서 (스냅샷 조회 1번만)
+        with self.assertNumQueries(1):
+            self.client.get("/api/books/popular/", {"q": "weekly"})
+
+
+class IngestClaimTests(TestCase):
+    """멈춘 RUNNING 작업은 다시 가져가되, INGEST_TASK_MAX_ATTEMPTS번 멈추면 FAILED"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = Book.objects.create(
+            isbn="9780000000201",
+            title="희랍어 시간",
+            publisher="문학동네",
+            published_date="2011-11-21",
+            page_count=10,
+            lang="ko",
+            toc=[],
+        )
+
+    def stale_task(self, attempts):
+        started_at = timezone.now() - timedelta(seconds=settings.INGEST_TASK_TIMEOUT_SECONDS + 1)
+        return BookIngestTask.objects.create(
+            book=self.book, status=BookIngestTask.Status.RUNNING, started_at=started_at, attempts=attempts,
+        )
+
+    def test_stale_task_is_reclaimed_with_attempt_counted(self):
+        task = self.stale_task(attempts=settings.INGEST_TASK_MAX_ATTEMPTS - 1)
+
+        claimed = claim_next_task()
+
+        self.assertEqual(claimed.id, task.id)
+        self.assertEqual(claimed.attempts, settings.INGEST_TASK_MAX_ATTEMPTS)
+
+    def test_exhausted_task_is_failed_not_reclaimed(self):
+        task = self.stale_task(attempts=settings.INGEST_TASK_MAX_ATTEMPTS)
+
+        self.assertIsNone(claim_next_task())
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, BookIngestTask.Status.FAILED)
+        self.assertIsNotNone(task.finished_at)
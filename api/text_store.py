@@ -0,0 +1,447 @@
+import mmap
+import os
+import posixpath
+import struct
+import sys
+import threading
+import zipfile
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
+
+from django.conf import settings
+
+from lxml import etree
+
+# N글자마다 byte offset을 기록 (from 위치까지 seek 후 최대 N글자만 더 읽으면 됨)
+CHECKPOINT_CHARS = 4096
+INDEX_VERSION = 4
+
+# 인덱스 파일(.idx) 레이아웃 (little-endian)
+# header: magic, version, checkpoint_chars, total_length, byte_length, source_mtime_ns, source_size, count
+# body  : uint64 byte offset * count  (i번째 = i * checkpoint_chars 글자 위치)
+INDEX_MAGIC = b"BPTX"
+INDEX_HEADER = struct.Struct("<4sIIQQqQQ")
+INDEX_ENTRY = struct.Struct("<Q")
+
+CHAPTER_SEPARATOR = "\n\n"
+READ_CHUNK_BYTES = 64 * 1024
+
+CONTAINER_NS = "{urn:oasis:names:tc:opendocument:xmlns:container}"
+OPF_NS = "{http://www.idpf.org/2007/opf}"
+DOCUMENT_MEDIA_TYPES = ("application/xhtml+xml", "text/html")
+# 기존 ebooklib + get_text() 결과와 동일하게 본문으로 취급하지 않는 태그
+# (ebooklib은 문서를 다시 직렬화하면서 <head>를 비움)
+SKIP_TAGS = {"head", "script", "style", "template"}
+
+# 본문을 이어 붙이는 문서 범위/순서 (Book.text_layout). 바뀌면 뒤쪽 글자 위치가 모두 밀리므로
+# 저장된 읽기 위치(current_location)가 있는 기존 도서는 예전 방식을 그대로 씀
+LAYOUT_SPINE = "spine"        # spine 순서(읽는 순서)의 문서
+LAYOUT_MANIFEST = "manifest"  # manifest 순서의 XHTML 문서 전부 (nav 포함, ebooklib 추출과 동일)
+
+
+def _read_opf(zf: zipfile.ZipFile):
+    """
+    container.xml -> OPF 문서와 OPF가 있는 디렉터리(상대 경로 기준점) 반환
+    """
+    container = etree.fromstring(zf.read("META-INF/container.xml"))
+    rootfile = container.find(f".//{CONTAINER_NS}rootfile")
+    opf_path = rootfile.get("full-path")
+    return etree.fromstring(zf.read(opf_path)), posixpath.dirname(opf_path)
+
+
+def _resolve_href(base_dir: str, href: str) -> str:
+    href = unquote((href or "").split("#", 1)[0])
+    return posixpath.normpath(posixpath.join(base_dir, href))
+
+
+def _spine_documents(zf: zipfile.ZipFile):
+    """
+    OPF spine 순서(=읽는 순서)대로 (manifest id, zip 내부 경로) 반환
+    """
+    opf, base_dir = _read_opf(zf)
+
+    manifest = {
+        item.get("id"): item
+        for item in opf.iterfind(f"{OPF_NS}manifest/{OPF_NS}item")
+    }
+
+    documents = []
+    for itemref in opf.iterfind(f"{OPF_NS}spine/{OPF_NS}itemref"):
+        item = manifest.get(itemref.get("idref"))
+        if item is None or item.get("media-type") not in DOCUMENT_MEDIA_TYPES:
+            continue
+        documents.append((item.get("id"), _resolve_href(base_dir, item.get("href"))))
+    return documents
+
+
+def _manifest_documents(zf: zipfile.ZipFile):
+    """
+    manifest 순서대로 XHTML 문서 전부 (manifest id, zip 내부 경로) 반환
+    (ebooklib ITEM_DOCUMENT와 같은 범위: media-type이 application/xhtml+xml인 항목, nav 문서 포함)
+    """
+    opf, base_dir = _read_opf(zf)
+    return [
+        (item.get("id"), _resolve_href(base_dir, item.get("href")))
+        for item in opf.iterfind(f"{OPF_NS}manifest/{OPF_NS}item")
+        if item.get("media-type") == "application/xhtml+xml"
+    ]
+
+
+def epub_nav_entries(epub_path: str) -> list[dict]:
+    """
+    EPUB 자체 목차를 [{"title", "href"}]로 반환 (href는 zip 내부 경로, fragment 제외)
+    - EPUB3: manifest에서 properties="nav" 문서의 <nav> 링크
+    - EPUB2: spine@toc가 가리키는 NCX의 navPoint
+    """
+    with zipfile.ZipFile(epub_path) as zf:
+        opf, base_dir = _read_opf(zf)
+        items = list(opf.iterfind(f"{OPF_NS}manifest/{OPF_NS}item"))
+
+        nav_item = next((i for i in items if "nav" in (i.get("properties") or "").split()), None)
+        if nav_item is not None:
+            nav_path = _resolve_href(base_dir, nav_item.get("href"))
+            doc = etree.fromstring(zf.read(nav_path), etree.HTMLParser(encoding="utf-8"))
+            nav_dir = posixpath.dirname(nav_path)
+            return [
+                {"title": " ".join(a.itertext()).strip(), "href": _resolve_href(nav_dir, a.get("href"))}
+                for a in doc.iterfind(".//nav//a")
+                if a.get("href")
+            ]
+
+        spine = opf.find(f"{OPF_NS}spine")
+        ncx_item = next((i for i in items if i.get("id") == spine.get("toc")), None) if spine is not None else None
+        if ncx_item is None:
+            return []
+        ncx_path = _resolve_href(base_dir, ncx_item.get("href"))
+        ncx = etree.fromstring(zf.read(ncx_path))
+        ncx_dir = posixpath.dirname(ncx_path)
+        entries = []
+        for point in ncx.iter("{*}navPoint"):
+            label = point.find("{*}navLabel/{*}text")
+            content = point.find("{*}content")
+            if content is None:
+                continue
+            entries.append({
+                "title": (label.text or "").strip() if label is not None else "",
+                "href": _resolve_href(ncx_dir, content.get("src")),
+            })
+        return entries
+
+
+class _TextCollector:
+    """
+    lxml parser target: 문서 순서대로 텍스트 노드를 모은다.
+    BeautifulSoup.get_text(separator="\n", strip=True)와 같은 규칙
+    (노드별 strip, 빈 노드 제외, script/style/주석 제외)
+    """
+
+    def __init__(self):
+        self.parts = []
+        self._buf = []
+        self._skip_depth = 0
+
+    def _flush(self):
+        if self._buf:
+            text = "".join(self._buf).strip()
+            self._buf = []
+            if text and not self._skip_depth:
+                self.parts.append(text)
+
+    def start(self, tag, attrib):
+        self._flush()
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+
+    def end(self, tag):
+        self._flush()
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def data(self, data):
+        self._buf.append(data)
+
+    def comment(self, text):
+        self._flush()
+
+    def close(self):
+        self._flush()
+        return "\n".join(self.parts)
+
+
+def _document_text(stream) -> str:
+    """
+    zip 스트림을 READ_CHUNK_BYTES씩 읽어 lxml에 흘려보내며 파싱 (문서 전체를 트리로 만들지 않음)
+    """
+    parser = etree.HTMLParser(target=_TextCollector(), encoding="utf-8", recover=True)
+    while True:
+        chunk = stream.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        parser.feed(chunk)
+    return parser.close()
+
+
+def iter_epub_chapters(epub_path: str, layout: str = LAYOUT_SPINE):
+    """
+    layout 순서대로 본문이 있는 문서(챕터)를 하나씩 반환하는 제너레이터.
+    yield {"id", "href", "text"}
+    """
+    with zipfile.ZipFile(epub_path) as zf:
+        documents = _manifest_documents(zf) if layout == LAYOUT_MANIFEST else _spine_documents(zf)
+        for item_id, name in documents:
+            try:
+                stream = zf.open(name)
+            except KeyError:
+                continue
+            with stream:
+                text = _document_text(stream)
+            if text:
+                yield {"id": item_id, "href": name, "text": text}
+
+
+def extract_text_from_epub(epub_path: str, layout: str = LAYOUT_SPINE) -> str:
+    return CHAPTER_SEPARATOR.join(ch["text"] for ch in iter_epub_chapters(epub_path, layout))
+
+
+class EpubTextCache:
+    """
+    워커(프로세스) 단위 파싱 결과 LRU 캐시.
+    - key: (isbn, EPUB mtime_ns, EPUB size, layout) -> 파일이 바뀌면 자연스럽게 miss
+    - 항목 수가 아니라 문자열 메모리 크기 합계(max_bytes) 기준으로 축출
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()  # isbn -> (key, text, size)
+        self._lock = threading.Lock()
+
+    def get(self, isbn: str, epub_path: str, layout: str = LAYOUT_SPINE) -> str:
+        st = os.stat(epub_path)
+        key = (isbn, st.st_mtime_ns, st.st_size, layout)
+
+        with self._lock:
+            entry = self._items.get(isbn)
+            if entry is not None and entry[0] == key:
+                self._items.move_to_end(isbn)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        text = extract_text_from_epub(epub_path, layout)
+        self._put(isbn, key, text)
+        return text
+
+    def _put(self, isbn: str, key: tuple, text: str):
+        size = sys.getsizeof(text)
+        with self._lock:
+            old = self._items.pop(isbn, None)
+            if old is not None:
+                # 같은 책의 이전 버전(EPUB 교체됨)은 무효화
+                self.current_bytes -= old[2]
+
+            if size > self.max_bytes:
+                return
+
+            self._items[isbn] = (key, text, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._items.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "entries": len(self._items),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# 텍스트 저장소에 쓸 수 없는 환경에서 bookview_content가 사용하는 대체 경로
+epub_text_cache = EpubTextCache(settings.EPUB_TEXT_CACHE_MAX_BYTES)
+
+
+def resolve_epub_path(epub_file: str) -> str:
+    """
+    Book.epub_file -> MEDIA_ROOT 기준 로컬 경로
+    - 더미 데이터: "epubs/978....epub" 같은 상대경로
+    - admin 업로드: "http://host/media/epubs/978....epub" 같은 절대 URL
+    """
+    rel = urlparse(epub_file).path if "://" in epub_file else epub_file
+    if rel.startswith(settings.MEDIA_URL):
+        rel = rel[len(settings.MEDIA_URL):]
+    return os.path.join(settings.MEDIA_ROOT, rel.lstrip("/"))
+
+
+def _paths(isbn: str):
+    root = settings.BOOK_TEXT_ROOT
+    return (
+        os.path.join(root, f"{isbn}.txt"),
+        os.path.join(root, f"{isbn}.idx"),
+    )
+
+
+def _source_stat(epub_path: str) -> dict:
+    st = os.stat(epub_path)
+    return {"source_mtime_ns": st.st_mtime_ns, "source_size": st.st_size}
+
+
+def load_index(isbn: str, epub_path: str) -> dict | None:
+    """
+    저장된 인덱스의 헤더를 반환. 없거나 EPUB 파일이 바뀌었으면 None.
+    (체크포인트 본문은 읽지 않음 -> 책 크기와 무관하게 고정 비용)
+    """
+    _, idx_path = _paths(isbn)
+    try:
+        with open(idx_path, "rb") as f:
+            raw = f.read(INDEX_HEADER.size)
+    except OSError:
+        return None
+    if len(raw) < INDEX_HEADER.size:
+        return None
+
+    magic, version, step, total_length, byte_length, mtime_ns, size, count = INDEX_HEADER.unpack(raw)
+    if magic != INDEX_MAGIC or version != INDEX_VERSION:
+        return None
+
+    index = {
+        "checkpoint_chars": step,
+        "total_length": total_length,
+        "byte_length": byte_length,
+        "source_mtime_ns": mtime_ns,
+        "source_size": size,
+        "checkpoint_count": count,
+    }
+    for key, value in _source_stat(epub_path).items():
+        if index[key] != value:
+            return None
+    return index
+
+
+class _TextStoreWriter:
+    """
+    본문을 조각 단위로 받아 파일에 쓰면서 CHECKPOINT_CHARS 글자마다 byte offset을 기록
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.chars = 0
+        self.bytes = 0
+        self.checkpoints = []
+
+    def write(self, text: str):
+        pos = 0
+        while pos < len(text):
+            if self.chars % CHECKPOINT_CHARS == 0:
+                self.checkpoints.append(self.bytes)
+            take = min(len(text) - pos, CHECKPOINT_CHARS - self.chars % CHECKPOINT_CHARS)
+            data = text[pos:pos + take].encode("utf-8")
+            self.f.write(data)
+            self.chars += take
+            self.bytes += len(data)
+            pos += take
+
+
+def build_text_store(isbn: str, epub_path: str, layout: str = LAYOUT_SPINE) -> dict:
+    """
+    EPUB을 1회 파싱해서 본문(.txt)과 인덱스(.idx)를 저장한다.
+    - 본문: UTF-8 평문 (mmap으로 필요한 byte 구간만 디코딩)
+    - 인덱스: 고정 길이 헤더 + CHECKPOINT_CHARS 글자마다의 byte offset 테이블
+    챕터 단위로 추출하면서 바로 파일에 쓰므로 책 전체를 메모리에 올리지 않는다.
+    반환값의 "chapters"에는 챕터별 [start, end) 글자 위치, "word_count"에는 공백 기준 단어 수가 들어있다.
+    """
+    stat = _source_stat(epub_path)
+
+    os.makedirs(settings.BOOK_TEXT_ROOT, exist_ok=True)
+    txt_path, idx_path = _paths(isbn)
+
+    # 임시 파일에 쓰고 교체 (읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)
+    # 인덱스를 마지막에 교체하므로 인덱스가 보이면 본문도 완성된 상태
+    pid = os.getpid()
+    chapters = []
+    word_count = 0
+    try:
+        with open(f"{txt_path}.{pid}.tmp", "wb") as f:
+            writer = _TextStoreWriter(f)
+            for chapter in iter_epub_chapters(epub_path, layout):
+                if chapters:
+                    writer.write(CHAPTER_SEPARATOR)
+                start = writer.chars
+                writer.write(chapter["text"])
+                chapters.append({"id": chapter["id"], "href": chapter["href"], "start": start, "end": writer.chars})
+                word_count += len(chapter["text"].split())
+    except BaseException:
+        if os.path.exists(f"{txt_path}.{pid}.tmp"):
+            os.remove(f"{txt_path}.{pid}.tmp")
+        raise
+
+    index = {
+        "checkpoint_chars": CHECKPOINT_CHARS,
+        "total_length": writer.chars,
+        "byte_length": writer.bytes,
+        **stat,
+        "checkpoint_count": len(writer.checkpoints),
+    }
+
+    os.replace(f"{txt_path}.{pid}.tmp", txt_path)
+
+    with open(f"{idx_path}.{pid}.tmp", "wb") as f:
+        f.write(INDEX_HEADER.pack(
+            INDEX_MAGIC, INDEX_VERSION, CHECKPOINT_CHARS,
+            index["total_length"], index["byte_length"],
+            index["source_mtime_ns"], index["source_size"],
+            index["checkpoint_count"],
+        ))
+        f.write(struct.pack(f"<{len(writer.checkpoints)}Q", *writer.checkpoints))
+    os.replace(f"{idx_path}.{pid}.tmp", idx_path)
+
+    return {**index, "chapters": chapters, "word_count": word_count}
+
+
+def ensure_text_store(isbn: str, epub_path: str, layout: str = LAYOUT_SPINE) -> dict:
+    """
+    저장된 인덱스가 유효하면 그대로, 아니면 새로 만들어서 반환 (lazy build)
+    """
+    index = load_index(isbn, epub_path)
+    if index is None:
+        index = build_text_store(isbn, epub_path, layout)
+    return index
+
+
+def _checkpoint(idx_map, i: int) -> int:
+    return INDEX_ENTRY.unpack_from(idx_map, INDEX_HEADER.size + i * INDEX_ENTRY.size)[0]
+
+
+def read_slice(isbn: str, index: dict, start: int, end: int) -> str:
+    """
+    [start, end) 글자 구간만 읽는다.
+    본문/인덱스 모두 mmap으로 열어서 체크포인트 2개만 조회(O(1)) 후 해당 byte 구간만 디코딩.
+    페이지는 OS page cache를 통해 워커 간에 공유되고, 프로세스 상주 메모리는 거의 늘지 않음.
+    """
+    if start >= end:
+        return ""
+
+    step = index["checkpoint_chars"]
+    count = index["checkpoint_count"]
+    first = start // step
+    last = (end - 1) // step
+
+    txt_path, idx_path = _paths(isbn)
+    with open(idx_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as idx_map:
+        byte_from = _checkpoint(idx_map, first)
+        byte_to = _checkpoint(idx_map, last + 1) if last + 1 < count else index["byte_length"]
+
+    with open(txt_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as text_map:
+        chunk = text_map[byte_from:byte_to].decode("utf-8")
+
+    offset = first * step
+    return chunk[start - offset:end - offset]
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+# 이벤트별 점수
+TRENDING_WEIGHTS = {
+    "read": 1.0,      # 사용자-도서-날짜당 첫 읽기
+    "like": 3.0,
+    "comment": 2.0,
+}
+
+# 반감기: 점수가 반으로 줄어드는 시간
+TRENDING_HALF_LIFE = timedelta(days=3)
+
+# 점수는 "기준 시각(EPOCH) 대비 커지는 가중치"로 저장 (감쇠 대신 새 이벤트를 더 크게 더함)
+#   저장값 = Σ weight * 2^((이벤트 시각 - EPOCH) / 반감기)
+#   -> 모든 도서가 같은 비율로 줄어드는 것과 순위가 같으므로 주기적으로 전체를 다시 계산할 필요 없음
+# 반감기 3일이면 float 범위(2^1023)까지 약 8년. 그 전에 EPOCH를 옮기고
+# 전체 점수에 2^(-이동한 시간 / 반감기)를 한 번 곱해주면 됨
+TRENDING_EPOCH = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def trending_increment(event: str, at=None) -> float:
+    """at 시각에 발생한 event 1건이 더할 저장값"""
+    at = at or timezone.now()
+    return TRENDING_WEIGHTS[event] * 2 ** ((at - TRENDING_EPOCH) / TRENDING_HALF_LIFE)
+
+
+def trending_add(event: str, at=None):
+    """update(trending_score=...)에 넣을 증가식"""
+    return F("trending_score") + trending_increment(event, at)
+
+
+def trending_remove(event: str, at=None):
+    """
+    좋아요 취소 등: at(원래 이벤트 시각) 가중치만큼 빼되 0 아래로는 내리지 않음
+    더할 때와 같은 시각을 넘겨야 정확히 상쇄됨 (지금 시각으로 빼면 오래된 이벤트 취소가 점수를 과하게 깎음)
+    """
+    return Greatest(F("trending_score") - trending_increment(event, at), Value(0.0))
+
+
+def decayed_score(stored: float, at=None) -> float:
+    """저장값 -> at 시각 기준 실제 점수 (응답 표시용)"""
+    at = at or timezone.now()
+    return stored / 2 ** ((at - TRENDING_EPOCH) / TRENDING_HALF_LIFE)
@@ -6,16 +6,19 @@ urlpatterns = [
     # books
     path("books/popular/", views.books_popular),
     path("books/search/", views.books_search),
+    path("books/autocomplete/", views.books_autocomplete),
     path("books/<str:isbn>/", views.book_detail),
     path("books/<str:isbn>/likes/", views.book_like_toggle),
     path("books/<str:isbn>/wishlist/", views.book_wishlist_toggle),
     path("books/<str:isbn>/comment/", views.book_comment_create),  # POST
+    path("books/<str:isbn>/comments/", views.book_comment_list),  # GET (cursor 페이지네이션)
     path("books/<str:isbn>/comment/<int:comment_id>/", views.book_comment_detail),  # GET (공개)
     path("books/<str:isbn>/comment/<int:comment_id>/edit/", views.book_comment_edit),  # PUT/PATCH
     path("books/<str:isbn>/comment/<int:comment_id>/delete/", views.book_comment_delete),  # DELETE
     path("books/<str:isbn>/library/", views.book_library),
 
     # bookviews
+    path("bookviews/progress/batch/", views.bookview_progress_batch),  # POST (오프라인 일괄 동기화)
     path("bookviews/<str:isbn>/", views.bookview_meta),
     path("bookviews/<str:isbn>/content/", views.bookview_content),
     path("bookviews/<str:isbn>/progress/", views.bookview_progress),
@@ -23,11 +26,13 @@ urlpatterns = [
     # main
     path("main/current-reading/", views.main_current_reading),
     path("main/banner/", views.main_banner),
+    path("main/home/", views.main_home),  # 메인 화면 묶음 조회
 
     # admin
     path("admin/books/", admin_views.admin_book_create),
     path("admin/authors/", admin_views.admin_author_list),
     path("admin/genres/", views.genre_list),
+    path("admin/cache-stats/", admin_views.admin_cache_stats),
 
     # JWT 교환(exchange) 엔드포인트
     path("auth/jwt/exchange/", views.jwt_exchange),
@@ -1,3 +1,4 @@
+import base64
 import os
 from django.conf import settings
 
@@ -9,21 +10,38 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authentication import SessionAuthentication
+from django.core.cache import cache
 from django.db import transaction
 from django.db.models import F, Q
 from django.utils import timezone
-from datetime import timedelta
-
-from ebooklib import epub
-from bs4 import BeautifulSoup
+from django.utils.dateparse import parse_datetime
+from datetime import date, datetime
 
 from .models import (
     Book, AuthorsBook, BookTag, Tag,
     UserBookHistory, UserBookLike, Wishlist,
-    Library, UserBookHistory, UserBookTag, GenreChild
+    Library, UserBookHistory, UserBookTag, GenreChild,
+    COMMENT_PRESENT,
 )
 from .permissions import IsActiveUser
-from .constants import MAIN_BANNERS
+from . import text_store
+from .autocomplete import autocomplete_index
+from .facets import facet_index
+from .popular import POPULAR_KINDS, popular_items, with_user_flags
+from .book_stats import record_daily_read
+from .trending import trending_add, trending_remove
+from .progress_buffer import ProgressEntry, pending_progress, progress_buffer, sync_progress
+from .reading_log import EVENT_MAX_AGE, content_record, progress_record, reading_log
+from .reading_status import current_reading_history
+from .home import HOME_POPULAR_KINDS, build_home, main_banners
+from .search import get_search_backend
+from .caches import (
+    BOOK_DETAIL_CACHE_TIMEOUT,
+    SEARCH_CACHE_TIMEOUT,
+    book_detail_cache_key,
+    invalidate_book_detail,
+    search_cache_key,
+)
 from .serializers import (
     CurrentReadingBookSerializer,
     BookCommentDetailSerializer,
@@ -32,14 +50,15 @@ from .serializers import (
 )
 
 MAX_COMMENT_LENGTH = 280
-LIST_LIMIT = 30 # 인기 목록을 최대 30권까지만
+COMMENT_PAGE_SIZE = 20
+MAX_COMMENT_PAGE_SIZE = 50
 TOP_TAGS_LIMIT = 3
 
 # 검색 결과 갯수 제한
 DEFAULT_LIMIT = 20
 MAX_LIMIT = 50
+SEARCH_FILTER_CANDIDATES = 1000  # 검색어 + 필터일 때 필터와 교집합할 검색 상위 후보 수
 
-BANNER_LIMIT = 4
 
 def error_response(message, code, status_code):
     return Response(
@@ -53,19 +72,84 @@ def error_response(message, code, status_code):
 # --------------------------
 # Books
 # --------------------------
-@api_view(["GET"])
-@permission_classes([AllowAny])
-@authentication_classes([])
-def book_detail(request, isbn):
+def _comments_qs(isbn):
+    # ubh_book_comment_idx(book, -commented_at, -id WHERE COMMENT_PRESENT)를 타는 조건
+    # (작성 시각 순: 읽기마다 바뀌는 last_read_at으로 정렬하면 캐시된 목록 순서가 금방 어긋남)
+    return (
+        UserBookHistory.objects
+        .filter(COMMENT_PRESENT, book_id=isbn, commented_at__isnull=False)
+    )
+
+def _encode_comment_cursor(h) -> str:
+    raw = f"{h.commented_at.isoformat()}|{h.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_comment_cursor(cursor: str):
+    """
+    (commented_at, id) 반환. 형식이 잘못되면 ValueError (base64/디코딩/파싱 오류 모두 ValueError 계열)
+    """
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    ts, comment_id = raw.split("|", 1)
+    return datetime.fromisoformat(ts), int(comment_id)
+
+def _comment_page(isbn, cursor, limit):
+    """
+    (-commented_at, -id) 순서의 keyset 페이지네이션.
+    cursor = 직전 페이지 마지막 코멘트의 (commented_at, id) -> OFFSET 없이 인덱스에서 바로 이어 읽음
+    반환: (comments, next_cursor)  / is_owner는 False (호출하는 쪽에서 덮어씀)
+    """
+    qs = _comments_qs(isbn).select_related("user").order_by("-commented_at", "-id")
+    if cursor:
+        commented_at, last_id = _decode_comment_cursor(cursor)
+        qs = qs.filter(
+            Q(commented_at__lt=commented_at) |
+            Q(commented_at=commented_at, id__lt=last_id)
+        )
+
+    rows = list(qs[:limit + 1])
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    comments = []
+    for h in rows:
+        comments.append({
+            "comment_id": h.id,  # UserBookHistory.id
+            "user": {
+                "id": h.user.id,
+                "nickname": h.user.nickname,
+                "profile_image": h.user.profile_image,
+            },
+            "created_at": h.commented_at,
+            "content": h.comment,
+            "is_owner": False,
+        })
+
+    next_cursor = _encode_comment_cursor(rows[-1]) if has_next else None
+    return comments, next_cursor
+
+def _overlay_is_owner(comments, user):
+    if not user.is_authenticated:
+        return comments
+    return [
+        {**c, "is_owner": c["user"]["id"] == user.id}
+        for c in comments
+    ]
+
+def _book_detail_payload(isbn):
+    """
+    book_detail 응답 중 사용자와 무관한 부분 (ISBN별 캐시)
+    is_liked / is_wished / comments[].is_owner는 False로 두고 요청마다 덮어씀
+    """
+    cache_key = book_detail_cache_key(isbn)
+    payload = cache.get(cache_key)
+    if payload is not None:
+        return payload
 
     # Book 조회
     try:
         book = Book.objects.select_related("genre__parent").get(isbn=isbn)
     except Book.DoesNotExist:
-        return Response(
-            {"message": "도서를 찾을 수 없습니다."},
-            status=status.HTTP_404_NOT_FOUND,
-        )
+        return None
 
     # 장르 경로
     genre_path = None
@@ -93,88 +177,117 @@ def book_detail(request, isbn):
     # 태그 사용 (book.top_tags 상위 5개)
     book_tags = book.top_tags[:10] if book.top_tags else []
 
-    # 좋아요 여부
-    is_liked = False
-    if request.user.is_authenticated:
-        is_liked = UserBookLike.objects.filter(
-            user=request.user,
-            book=book
-        ).exists()
+    # 댓글 (UserBookHistory.comment 기반) - 첫 페이지만, 나머지는 comments 엔드포인트
+    comments, next_cursor = _comment_page(book.isbn, None, COMMENT_PAGE_SIZE)
 
-    # 댓글 (UserBookHistory.comment 기반)
-    comments_qs = (
-        UserBookHistory.objects
-        .select_related("user")
-        .filter(
-            book=book,
-            comment__isnull=False,
-        )
-        .exclude(comment__exact="")
-        .order_by("-last_read_at", "-id")
-    )
+    payload = {
+        "isbn": book.isbn,
+        "title": book.title,
+        "genre_path": genre_path,
+        "cover_image": book.cover_image,
 
-    comments = []
-    for h in comments_qs:
-        comments.append({
-            "comment_id": h.id,  # UserBookHistory.id
-            "user": {
-                "id": h.user.id,
-                "nickname": h.user.nickname,
-                "profile_image": h.user.profile_image,
-            },
-            "created_at": h.last_read_at,
-            "content": h.comment,
-            "is_owner": (
-                request.user.is_authenticated
-                and request.user.id == h.user.id
-            ),
-        })
+        "authors": authors,
 
-    is_wished = False
-    if request.user.is_authenticated:
-        is_wished = Wishlist.objects.filter(user=request.user, book=book).exists()
+        "publisher": book.publisher,
+        "published_date": book.published_date,
 
-    # 응답
-    response = {
-        "message": "도서 상세 정보 조회 성공",
-        "book": {
-            "isbn": book.isbn,
-            "title": book.title,
-            "genre_path": genre_path,
-            "cover_image": book.cover_image,
+        "like_count": book.like_count,
+        "is_liked": False,
+        "is_wished": False,
+        "epub_url": book.epub_file,
 
-            "authors": authors,
+        "action_urls": {
+            "read_now_url": f"https://example.com/reader/{book.isbn}",
+            "wish_url": f"https://example.com/users/wish/{book.isbn}",
+            "purchase_url": book.purchase_link,
+        },
 
-            "publisher": book.publisher,
-            "published_date": book.published_date,
+        # 임시 더미 (추후 추천/AI 로직으로 대체)
+        "why_picked": {
+            "body": book.recommendation_refer[0] if (book.recommendation_refer and len(book.recommendation_refer) > 0) else ""
+        },
 
-            "like_count": book.like_count,
-            "is_liked": is_liked,
-            "is_wished": is_wished,
-            "epub_url": book.epub_file,
+        "book_tags": book_tags,
 
-            "action_urls": {
-                "read_now_url": f"https://example.com/reader/{book.isbn}",
-                "wish_url": f"https://example.com/users/wish/{book.isbn}",
-                "purchase_url": book.purchase_link,
-            },
+        "description": book.full_descript,
 
-            # 임시 더미 (추후 추천/AI 로직으로 대체)
-            "why_picked": {
-                "body": book.recommendation_refer[0] if (book.recommendation_refer and len(book.recommendation_refer) > 0) else ""
-            },
+        "comments": comments,
+        "comment_count": book.comment_count,
+        "comments_next_cursor": next_cursor,
+    }
 
-            "book_tags": book_tags,
+    cache.set(cache_key, payload, BOOK_DETAIL_CACHE_TIMEOUT)
+    return payload
 
-            "description": book.full_descript,
+@api_view(["GET"])
+@authentication_classes([JWTAuthentication])
+@permission_classes([AllowAny])
+def book_detail(request, isbn):
 
+    # 1) 공통 payload (캐시)
+    payload = _book_detail_payload(isbn)
+    if payload is None:
+        return Response(
+            {"message": "도서를 찾을 수 없습니다."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    # 2) 사용자별 값 덮어쓰기 (좋아요/찜 여부, 본인 코멘트)
+    is_liked = False
+    is_wished = False
+    if request.user.is_authenticated:
+        is_liked = UserBookLike.objects.filter(user=request.user, book_id=isbn).exists()
+        is_wished = Wishlist.objects.filter(user=request.user, book_id=isbn).exists()
+
+    comments = _overlay_is_owner(payload["comments"], request.user)
+
+    # 응답
+    response = {
+        "message": "도서 상세 정보 조회 성공",
+        "book": {
+            **payload,
+            "is_liked": is_liked,
+            "is_wished": is_wished,
             "comments": comments,
-            "comment_count": len(comments),
         }
     }
 
     return Response(response, status=status.HTTP_200_OK)
 
+@api_view(["GET"])
+@authentication_classes([JWTAuthentication])
+@permission_classes([AllowAny])
+def book_comment_list(request, isbn):
+    """
+    GET /books/<isbn>/comments/?cursor=<next_cursor>&limit=20
+    book_detail에는 첫 페이지만 포함되고, 이후 페이지는 여기서 cursor로 이어서 조회
+    """
+    try:
+        limit = int(request.GET.get("limit", COMMENT_PAGE_SIZE))
+    except ValueError:
+        return error_response("limit은 정수여야 합니다.", "INVALID_QUERY", 400)
+    if limit < 1 or limit > MAX_COMMENT_PAGE_SIZE:
+        return error_response(f"limit은 1~{MAX_COMMENT_PAGE_SIZE} 사이여야 합니다.", "INVALID_LIMIT", 400)
+
+    if not Book.objects.filter(isbn=isbn).exists():
+        return error_response("도서를 찾을 수 없습니다.", "BOOK_NOT_FOUND", 404)
+
+    try:
+        comments, next_cursor = _comment_page(isbn, request.GET.get("cursor"), limit)
+    except ValueError:
+        return error_response("cursor 값이 올바르지 않습니다.", "INVALID_CURSOR", 400)
+
+    return Response(
+        {
+            "message": "도서 코멘트 목록 조회 성공",
+            "isbn": isbn,
+            "comments": _overlay_is_owner(comments, request.user),
+            "next_cursor": next_cursor,
+            "has_next": next_cursor is not None,
+        },
+        status=status.HTTP_200_OK,
+    )
+
 @api_view(["POST"])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated, IsActiveUser])
@@ -195,12 +308,15 @@ def book_like_toggle(request, isbn):
         )
 
         # 2. 이미 좋아요 상태 → 취소
-        if like_qs.exists():
+        # 트렌딩 점수는 좋아요를 누른 시각의 가중치만큼 뺌 (지금 가중치로 빼면 오래된 좋아요 취소가 다른 점수까지 깎음)
+        liked_at = like_qs.values_list("created_at", flat=True).first()
+        if liked_at is not None:
             like_qs.delete()
             Book.objects.filter(
                 isbn=book.isbn,
                 like_count__gt=0
-            ).update(like_count=F("like_count") - 1)
+            ).update(like_count=F("like_count") - 1, trending_score=trending_remove("like", liked_at))
+            invalidate_book_detail(book.isbn)
 
             book.refresh_from_db(fields=["like_count"])
             return Response(
@@ -215,8 +331,10 @@ def book_like_toggle(request, isbn):
         # 3. 좋아요 안 한 상태 → 생성
         UserBookLike.objects.create(user=request.user, book=book)
         Book.objects.filter(isbn=book.isbn).update(
-            like_count=F("like_count") + 1
+            like_count=F("like_count") + 1,
+            trending_score=trending_add("like"),
         )
+        invalidate_book_detail(book.isbn)
 
     book.refresh_from_db(fields=["like_count"])
     return Response(
@@ -408,9 +526,7 @@ def book_comment_create(request, isbn):
     # 3) 유저당 1개 코멘트 제한
     already = (
         UserBookHistory.objects
-        .filter(user=request.user, book=book)
-        .exclude(comment__isnull=True)
-        .exclude(comment__exact="")
+        .filter(COMMENT_PRESENT, user=request.user, book=book)
         .exists()
     )
     if already:
@@ -428,12 +544,23 @@ def book_comment_create(request, isbn):
             book=book,
             defaults={"started_at": now, "progress_percent": 0.0},
         )
-        history.comment = content
-        history.last_read_at = now
-        history.save(update_fields=["comment", "last_read_at", "updated_at"])
+        # 코멘트 없음 -> 있음으로 바뀐 경우에만 반영 (동시 요청이 카운터를 두 번 올리지 않도록)
+        written = (
+            UserBookHistory.objects
+            .filter(pk=history.pk)
+            .exclude(COMMENT_PRESENT)
+            .update(comment=content, commented_at=now, last_read_at=now, updated_at=now)
+        )
+        if not written:
+            return Response({"message": "이미 이 도서에 코멘트를 작성하셨습니다."}, status=status.HTTP_409_CONFLICT)
+        Book.objects.filter(isbn=book.isbn).update(
+            comment_count=F("comment_count") + 1,
+            trending_score=trending_add("comment", now),
+        )
 
         # 5) 태그 최종 상태 반영 (생성: old=없음 -> new=입력)
         sync_user_book_tags(user=request.user, book=book, new_tags=resolved_tags)
+        invalidate_book_detail(book.isbn)
 
     return Response(
         {
@@ -454,7 +581,12 @@ def book_comment_edit(request, isbn, comment_id):
         return Response({"message": "도서를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
 
     # 2) 본인 코멘트(history)인지 확인 (comment_id = UserBookHistory.id)
-    history = UserBookHistory.objects.filter(id=comment_id, user=request.user, book=book).first()
+    # 코멘트가 없는(삭제된) 기록은 수정 불가 -> 작성은 comment 생성으로 (comment_count 반영)
+    history = (
+        UserBookHistory.objects
+        .filter(COMMENT_PRESENT, id=comment_id, user=request.user, book=book)
+        .first()
+    )
     if not history:
         return Response({"message": "코멘트를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -472,12 +604,18 @@ def book_comment_edit(request, isbn, comment_id):
     resolved_tags = resolve_tags_from_payload(tags_payload)
 
     with transaction.atomic():
-        # 4) 코멘트 수정
-        history.comment = content
-        history.save(update_fields=["comment", "updated_at"])
+        # 4) 코멘트 수정 (그 사이 삭제됐으면 되살리지 않음)
+        updated = (
+            UserBookHistory.objects
+            .filter(COMMENT_PRESENT, pk=history.pk)
+            .update(comment=content, updated_at=timezone.now())
+        )
+        if not updated:
+            return Response({"message": "코멘트를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
 
         # 5) 태그 최종 상태로 동기화 (수정: old<->new diff만 반영)
         sync_user_book_tags(user=request.user, book=book, new_tags=resolved_tags)
+        invalidate_book_detail(book.isbn)
 
     return Response({"message": "도서 코멘트가 수정되었습니다."}, status=status.HTTP_200_OK)
 
@@ -498,11 +636,25 @@ def book_comment_delete(request, isbn, comment_id):
 
     with transaction.atomic():
         # 3) 코멘트 내용만 삭제 (히스토리는 유지)
-        history.comment = None  # 또는 ""로 통일해도 됨. 생성의 already 체크와 맞추는 게 중요
-        history.save(update_fields=["comment", "updated_at"])
+        # 있음 -> 없음으로 바뀐 경우에만 카운터 감소
+        removed = (
+            UserBookHistory.objects
+            .filter(COMMENT_PRESENT, pk=history.pk)
+            .update(comment=None, commented_at=None, updated_at=timezone.now())
+        )
+        if removed:
+            # 작성 때 더한 점수를 작성 시각 기준으로 되돌림 (작성/삭제 반복으로 점수가 계속 오르지 않도록)
+            Book.objects.filter(
+                isbn=book.isbn,
+                comment_count__gt=0
+            ).update(
+                comment_count=F("comment_count") - 1,
+                trending_score=trending_remove("comment", history.commented_at),
+            )
 
         # 4) 태그 전부 제거 (old -> empty)
         sync_user_book_tags(user=request.user, book=book, new_tags=[])
+        invalidate_book_detail(book.isbn)
 
     return Response({"message": "도서 코멘트가 삭제되었습니다."}, status=status.HTTP_200_OK)
 
@@ -620,9 +772,23 @@ def book_comment_delete(request, isbn, comment_id):
             status=status.HTTP_404_NOT_FOUND,
         )
 
-    # 5) 코멘트만 삭제 (레코드는 유지)
-    history.comment = None
-    history.save(update_fields=["comment", "updated_at"])
+    # 5) 코멘트만 삭제 (레코드는 유지) + 있음 -> 없음으로 바뀐 경우에만 카운터 감소
+    with transaction.atomic():
+        removed = (
+            UserBookHistory.objects
+            .filter(COMMENT_PRESENT, pk=history.pk)
+            .update(comment=None, commented_at=None, updated_at=timezone.now())
+        )
+        if removed:
+            # 작성 때 더한 점수를 작성 시각 기준으로 되돌림 (작성/삭제 반복으로 점수가 계속 오르지 않도록)
+            Book.objects.filter(
+                isbn=book.isbn,
+                comment_count__gt=0
+            ).update(
+                comment_count=F("comment_count") - 1,
+                trending_score=trending_remove("comment", history.commented_at),
+            )
+        invalidate_book_detail(book.isbn)
 
     return Response(
         {
@@ -651,12 +817,12 @@ def _pick_color(slug: str) -> str:
     return palette[acc % len(palette)]
 
 @api_view(["GET"])
-@authentication_classes([])
+@authentication_classes([JWTAuthentication])
 @permission_classes([AllowAny])
 def books_popular(request):
     q = request.GET.get("q", "weekly")
 
-    if q not in ["weekly", "monthly", "steady"]:
+    if q not in POPULAR_KINDS:
         return Response(
             {
                 "message": "잘못된 요청입니다.",
@@ -665,95 +831,17 @@ def books_popular(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    # 1) q에 따라 Book queryset 결정
-    if q == "weekly":
-        books_qs = (
-            Book.objects
-            .filter(readed_num_week__gt=0)
-            .order_by("-readed_num_week", "-like_count")
-            .prefetch_related("authors_book_list__author")
-        )
-    elif q == "monthly":
-        books_qs = (
-            Book.objects
-            .filter(readed_num_month__gt=0)
-            .order_by("-readed_num_month", "-like_count")
-            .prefetch_related("authors_book_list__author")
-        )
-    else:  # steady
-        books_qs = (
-            Book.objects
-            .filter(is_steady=True)
-            .order_by("-readed_num_month", "-like_count")
-            .prefetch_related("authors_book_list__author")
-        )
+    # 1) 사용자와 무관한 항목 (trending은 바로 정렬, 그 외는 스냅샷 -> 없으면 캐시)
+    items = popular_items(q)
 
-    books = list(books_qs[:LIST_LIMIT])
-    book_isbns = [b.isbn for b in books]
-
-    if not books:
+    if not items:
         return Response(
             {"message": "많이 읽힌 도서 목록 조회 성공", "query": q, "items": []},
             status=status.HTTP_200_OK,
         )
 
-    # 3) is_liked, is_wished 계산
-    liked_isbn_set = set()
-    wished_isbn_set = set()
-    if request.user.is_authenticated:
-        liked_isbn_set = set(
-            UserBookLike.objects
-            .filter(user=request.user, book__isbn__in=book_isbns)
-            .values_list("book__isbn", flat=True)
-        )
-        wished_isbn_set = set(
-            Wishlist.objects
-            .filter(user=request.user, book__isbn__in=book_isbns)
-            .values_list("book__isbn", flat=True)
-        )
-
-    # 4) 응답 조립
-    results = []
-    for book in books:
-        isbn = book.isbn
-
-        # top_tags string list
-        # DB에 저장된 top_tags(JSON) 앞 4개
-        tags_list = book.top_tags[:7] if book.top_tags else []
-
-        # 대표 작가 1명
-        main_author = None
-        # authors_book_list는 prefetch_related로 가져옴
-        authors = book.authors_book_list.all()
-        if authors:
-            # is_primary 우선, 없으면 첫 번째
-            primary = next((a for a in authors if a.is_primary), None)
-            if primary:
-                main_author = primary.author.name
-            else:
-                main_author = authors[0].author.name
-        
-        results.append({
-            "isbn": isbn,
-            "title": book.title,
-            "cover_image": book.cover_image,
-            "publisher": book.publisher,
-            "abstract_descript": book.abstract_descript,
-
-            "like_count": book.like_count,
-            "top_tags": tags_list,
-            "genres": book.top_tags if book.top_tags else [],
-            "author": main_author,
-
-            "is_liked": isbn in liked_isbn_set,
-            "is_wished": isbn in wished_isbn_set,
-
-            "links": {
-                "like_toggle_url": f"/books/{isbn}/likes",
-                "read_url": f"/bookviews/{isbn}",
-                "purchase_url": book.purchase_link,
-            },
-        })
+    # 2) 사용자별 is_liked, is_wished만 덧씌움
+    results = with_user_flags(request.user, items)
 
     serializer = PopularBookSerializer(results, many=True)
     return Response(
@@ -818,8 +906,56 @@ def book_library(request, isbn):
         status=status.HTTP_200_OK,
     )
 
+def _parse_search_filters(params) -> tuple[dict, str | None]:
+    """
+    books_search 필터 파라미터 파싱. (filters, 오류 필드명) 반환
+    - genre / genre_parent: 장르 id
+    - lang
+    - tags: 쉼표 구분, 모두 포함(AND)
+    - published_from / published_to: YYYY-MM-DD (양 끝 포함)
+    """
+    filters = {}
+
+    for field in ("genre", "genre_parent"):
+        raw = params.get(field, "").strip()
+        if raw:
+            try:
+                filters[field] = int(raw)
+            except ValueError:
+                return {}, field
+
+    lang = params.get("lang", "").strip()
+    if lang:
+        filters["lang"] = lang
+
+    tags = [t.strip() for raw in params.getlist("tags") for t in raw.split(",") if t.strip()]
+    if tags:
+        filters["tags"] = tags
+
+    for field in ("published_from", "published_to"):
+        raw = params.get(field, "").strip()
+        if raw:
+            try:
+                filters[field] = date.fromisoformat(raw)
+            except ValueError:
+                return {}, field
+
+    return filters, None
+
+def _ranked_search_isbns(query: str, limit: int) -> list[str]:
+    """
+    검색 인덱스에서 순위대로 ISBN 조회 (settings.BOOK_SEARCH_BACKEND)
+    사용자와 무관한 ISBN 리스트만 캐시하고 is_liked는 매 요청 덧씌움
+    """
+    cache_key = search_cache_key(query, limit)
+    ranked_isbns = cache.get(cache_key)
+    if ranked_isbns is None:
+        ranked_isbns = get_search_backend().search(query, limit)
+        cache.set(cache_key, ranked_isbns, SEARCH_CACHE_TIMEOUT)
+    return ranked_isbns
+
 @api_view(["GET"])
-@authentication_classes([])
+@authentication_classes([JWTAuthentication])
 @permission_classes([AllowAny])
 def books_search(request):
     """
@@ -828,13 +964,28 @@ def books_search(request):
     Book.subtitle
     Book.authors_book_list (= Author.name)
     Book.publisher
+
+    필터(genre, genre_parent, lang, tags, published_from, published_to)는 facet 인덱스(api.facets)로 거름
+    - 필터가 있거나 facets=true면 결과 집합 기준 facet 개수(facets)와 전체 건수(total)를 함께 응답
+      q가 있으면 검색 상위 SEARCH_FILTER_CANDIDATES개 안에서 센 값이라, 후보가 잘렸으면 approximate=true
+    - 필터만 있고 q가 없으면 좋아요 많은 순
     """
     query = request.GET.get("q", "").strip()
 
-    if not query:
+    filters, invalid_field = _parse_search_filters(request.GET)
+    if invalid_field:
         return Response(
             {
-                "message": "검색어(q)는 필수입니다.",
+                "message": f"{invalid_field} 값이 올바르지 않습니다.",
+                "error": {"code": "VALIDATION_ERROR", "field": invalid_field},
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if not query and not filters:
+        return Response(
+            {
+                "message": "검색어(q) 또는 필터 중 하나는 필수입니다.",
                 "error": {"code": "VALIDATION_ERROR", "field": "q"},
             },
             status=status.HTTP_400_BAD_REQUEST,
@@ -847,44 +998,67 @@ def books_search(request):
 
     limit = min(limit, MAX_LIMIT)
 
-    # 1) 검색 쿼리
-    books_qs = (
-        Book.objects
-        .prefetch_related("authors_book_list__author")
-        .filter(
-            Q(title__icontains=query) |
-            Q(subtitle__icontains=query) |
-            Q(publisher__icontains=query) |
-            Q(authors_book_list__author__name__icontains=query)
-        )
-        .distinct()
-        .order_by("-like_count", "title")[:limit]
-    )
-
-    # 2) 찜 여부 계산
+    # 1) 순위대로 ISBN 조회 (여기서 한 번만 실행)
+    facets = None
+    total = None
+    approximate = False
+    with_facets = bool(filters) or request.GET.get("facets") in ("1", "true")
+    if not with_facets:
+        ranked_isbns = _ranked_search_isbns(query, limit)
+    else:
+        # 요청 하나 안에서는 같은 스냅샷만 사용 (재생성되면 doc id가 바뀜)
+        snapshot = facet_index.snapshot()
+        bits = snapshot.filter_bits(**filters)
+        if query:
+            # 검색 상위 후보를 넉넉히 가져와 필터 비트맵과 교집합
+            candidates = _ranked_search_isbns(query, SEARCH_FILTER_CANDIDATES)
+            # 후보가 상한까지 찼으면 그 뒤 결과는 total/facets에 빠져 있음
+            approximate = len(candidates) >= SEARCH_FILTER_CANDIDATES
+            bits &= snapshot.bits_for_isbns(candidates)
+            ranked_isbns = [isbn for isbn in candidates if snapshot.contains(bits, isbn)][:limit]
+        else:
+            ranked_isbns = snapshot.top_isbns(bits, limit)
+        facets = snapshot.facet_counts(bits)
+        total = bits.bit_count()
+
+    # 2) ISBN 목록으로 도서 / 작가 / 좋아요 여부를 각각 한 번씩 조회
+    books_by_isbn = {}
+    author_names = {}
     liked_isbn_set = set()
-    if request.user.is_authenticated:
-        liked_isbn_set = set(
-            UserBookLike.objects
-            .filter(user=request.user, book__in=books_qs)
-            .values_list("book__isbn", flat=True)
-        )
+    if ranked_isbns:
+        books_by_isbn = Book.objects.only(
+            "isbn", "title", "publisher", "cover_image"
+        ).in_bulk(ranked_isbns)
+
+        for book_id, name in (
+            AuthorsBook.objects
+            .filter(book_id__in=ranked_isbns)
+            .order_by("id")
+            .values_list("book_id", "author__name")
+        ):
+            author_names.setdefault(book_id, []).append(name)
+
+        if request.user.is_authenticated:
+            liked_isbn_set = set(
+                UserBookLike.objects
+                .filter(user=request.user, book_id__in=ranked_isbns)
+                .values_list("book_id", flat=True)
+            )
 
-    # 3) 응답 조립
+    # 3) 응답 조립 (검색 순위 유지, 인덱스와 DB 사이에 삭제된 도서는 건너뜀)
     items = []
-    for book in books_qs:
-        authors = [
-            ab.author.name
-            for ab in book.authors_book_list.all()
-        ]
+    for isbn in ranked_isbns:
+        book = books_by_isbn.get(isbn)
+        if book is None:
+            continue
 
         items.append({
             "isbn": book.isbn,
             "title": book.title,
-            "authors": authors,
+            "authors": author_names.get(isbn, []),
             "publisher": book.publisher,
             "cover_image": book.cover_image,
-            "is_liked": book.isbn in liked_isbn_set,
+            "is_liked": isbn in liked_isbn_set,
         })
 
     serializer = BookSearchSerializer(items, many=True)
@@ -894,28 +1068,43 @@ def books_search(request):
             "message": "도서 검색 성공",
             "query": query,
             "items": serializer.data,
+            **({"total": total, "approximate": approximate, "facets": facets} if facets is not None else {}),
         },
         status=status.HTTP_200_OK,
     )
 
-# --------------------------
-# Bookviews
-# --------------------------
-def extract_text_from_epub(epub_path: str) -> str:
-    book = epub.read_epub(epub_path)
+AUTOCOMPLETE_LIMIT = 8
+MAX_AUTOCOMPLETE_LIMIT = 20
 
-    chunks = []
-    for item in book.get_items():
-        # 본문 문서만 추출 (ITEM_DOCUMENT)
-        # ebooklib에서 문서 타입이 9인 케이스가 일반적
-        if item.get_type() == 9:
-            soup = BeautifulSoup(item.get_content(), "html.parser")
-            text = soup.get_text(separator="\n", strip=True)
-            if text:
-                chunks.append(text)
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def books_autocomplete(request):
+    """
+    입력 중 추천어 (도서 제목 / 작가 이름 / 태그 이름)
+    DB를 거치지 않고 프로세스 내 prefix 인덱스(api.autocomplete)에서 바로 응답
+    """
+    query = request.GET.get("q", "").strip()
 
-    return "\n\n".join(chunks)
+    try:
+        limit = int(request.GET.get("limit", AUTOCOMPLETE_LIMIT))
+    except ValueError:
+        limit = AUTOCOMPLETE_LIMIT
 
+    limit = max(1, min(limit, MAX_AUTOCOMPLETE_LIMIT))
+
+    return Response(
+        {
+            "message": "자동완성 조회 성공",
+            "query": query,
+            "items": autocomplete_index.suggest(query, limit) if query else [],
+        },
+        status=status.HTTP_200_OK,
+    )
+
+# --------------------------
+# Bookviews
+# --------------------------
 @api_view(["GET"])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated, IsActiveUser])
@@ -951,31 +1140,44 @@ def bookview_content(request, isbn):
         return error_response("열람 기간이 만료되었습니다.", "EXPIRED", 403)
 
     # 4) epub 파일 경로 결정
-    # book.epub_file에 "epubs/978....epub" 같은 상대경로 저장
-    epub_rel = book.epub_file  # 현재 필드명 유지 (URLField라도 로컬경로 문자열이 들어있다는 가정)
-    epub_path = os.path.join(settings.MEDIA_ROOT, epub_rel)
+    # book.epub_file에는 상대경로("epubs/978....epub") 또는 업로드된 media 절대 URL이 저장됨
+    epub_path = text_store.resolve_epub_path(book.epub_file)
 
     if not os.path.exists(epub_path):
         return error_response("EPUB 파일을 찾을 수 없습니다.", "EPUB_NOT_FOUND", 404)
 
-    # 5) epub -> 전체 텍스트
+    # 5) 추출 텍스트 저장소 조회 (없거나 EPUB이 바뀐 경우에만 1회 파싱)
+    full_text = None
     try:
-        full_text = extract_text_from_epub(epub_path)
+        index = text_store.ensure_text_store(book.isbn, epub_path, book.text_layout)
+        total_length = index["total_length"]
+    except OSError:
+        # 저장소에 쓸 수 없는 환경 -> 워커 메모리 LRU 캐시로 대체
+        try:
+            full_text = text_store.epub_text_cache.get(book.isbn, epub_path, book.text_layout)
+        except Exception:
+            return error_response("EPUB 파싱에 실패했습니다.", "EPUB_PARSE_FAILED", 500)
+        total_length = len(full_text)
     except Exception:
         return error_response("EPUB 파싱에 실패했습니다.", "EPUB_PARSE_FAILED", 500)
 
-    total_length = len(full_text)
     if from_pos > total_length:
         return error_response("from이 본문 길이를 초과했습니다.", "OUT_OF_RANGE", 416)
 
-    # 6) 슬라이싱
+    # 6) 필요한 구간만 읽기
     end_pos = min(from_pos + limit, total_length)
-    content = full_text[from_pos:end_pos]
+    if full_text is None:
+        content = text_store.read_slice(book.isbn, index, from_pos, end_pos)
+    else:
+        content = full_text[from_pos:end_pos]
 
     has_more = end_pos < total_length
     next_from = end_pos if has_more else None
 
-    # 7) 응답
+    # 7) 분석용 이벤트 로그 (append-only 파일)
+    reading_log.append(content_record(request.user.id, book.isbn, from_pos, end_pos, now))
+
+    # 8) 응답
     return Response(
         {
             "message": "도서 본문 조회 성공",
@@ -1041,6 +1243,13 @@ def bookview_meta(request, isbn):
         started_at = None
         finished_at = None
 
+    # 아직 DB에 반영 안 된 최신 위치가 있으면 그 값 사용 (bookview_progress 버퍼)
+    pending = pending_progress(request.user.id, book.isbn)
+    if history and pending and (history.last_read_at is None or pending["read_at"] >= history.last_read_at):
+        initial_location = int(pending["location"])
+        progress_percent = float(pending["progress_percent"])
+        last_read_at = pending["read_at"].isoformat()
+
     # 6) progress_percent 범위 안전 처리(0~100)
     if progress_percent < 0:
         progress_percent = 0.0
@@ -1064,6 +1273,7 @@ def bookview_meta(request, isbn):
                     if book.published_date
                     else None,
                     "toc": book.toc,
+                    "chapter_map": book.chapter_map,
                 },
                 "permission": {
                     "can_read": True,
@@ -1073,6 +1283,7 @@ def bookview_meta(request, isbn):
                     "initial_location": initial_location,
                     "location_unit": "char",
                     "progress_percent": progress_percent,
+                    "total_length": book.text_length,
                 },
                 "reading_state": {
                     "started_at": started_at,
@@ -1098,154 +1309,253 @@ def bookview_meta(request, isbn):
         status=200,
     )
 
-@api_view(["POST"])
-@authentication_classes([JWTAuthentication])
-@permission_classes([IsAuthenticated, IsActiveUser])
-def bookview_progress(request, isbn):
-    # 1) 책 존재 확인 (Book pk=isbn)
-    try:
-        book = Book.objects.get(isbn=isbn)
-    except Book.DoesNotExist:
-        return Response(
-            {
-                "message": "도서를 찾을 수 없습니다.",
-                "error": {"code": "BOOK_NOT_FOUND"},
-            },
-            status=status.HTTP_404_NOT_FOUND,
-        )
+PROGRESS_LOCATION_UNITS = ["char", "page", "byte"]  # TODO: 뷰어 기준으로 허용값 조정 필요
+PROGRESS_BATCH_LIMIT = 500  # 일괄 동기화 한 번에 받는 이벤트 수
+PROGRESS_MAX_LOCATION = 2**31 - 1  # UserBookHistory.current_location (PositiveIntegerField) 범위
 
-    # 2) 요청 값 파싱
-    location = request.data.get("location")
-    location_unit = request.data.get("location_unit")
-    progress_percent = request.data.get("progress_percent")
 
-    # 3) 유효성 검사
+def _parse_progress_fields(data):
+    """
+    읽기 위치 요청 값 검사. ((location, location_unit, progress_percent), None) 또는 (None, (message, field)) 반환
+    """
+    location = data.get("location")
+    location_unit = data.get("location_unit")
+    progress_percent = data.get("progress_percent")
+
     # location
     if location is None:
-        return Response(
-            {"message": "location은 필수입니다.", "error": {"code": "VALIDATION_ERROR", "field": "location"}},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
+        return None, ("location은 필수입니다.", "location")
     try:
         location = int(location)
     except (TypeError, ValueError):
-        return Response(
-            {"message": "location은 정수여야 합니다.", "error": {"code": "VALIDATION_ERROR", "field": "location"}},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
+        return None, ("location은 정수여야 합니다.", "location")
     if location < 0:
-        return Response(
-            {"message": "location은 0 이상이어야 합니다.", "error": {"code": "VALIDATION_ERROR", "field": "location"}},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
+        return None, ("location은 0 이상이어야 합니다.", "location")
+    if location > PROGRESS_MAX_LOCATION:
+        return None, (f"location은 {PROGRESS_MAX_LOCATION} 이하여야 합니다.", "location")
 
     # location_unit
     if not location_unit:
-        return Response(
-            {"message": "location_unit은 필수입니다.", "error": {"code": "VALIDATION_ERROR", "field": "location_unit"}},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-    if location_unit not in ["char", "page", "byte"]:  # TODO: 뷰어 기준으로 허용값 조정 필요
-        return Response(
-            {"message": "location_unit 값이 올바르지 않습니다.", "error": {"code": "VALIDATION_ERROR", "field": "location_unit"}},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
+        return None, ("location_unit은 필수입니다.", "location_unit")
+    if location_unit not in PROGRESS_LOCATION_UNITS:
+        return None, ("location_unit 값이 올바르지 않습니다.", "location_unit")
 
     # progress_percent
     if progress_percent is None:
-        return Response(
-            {"message": "progress_percent는 필수입니다.", "error": {"code": "VALIDATION_ERROR", "field": "progress_percent"}},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
+        return None, ("progress_percent는 필수입니다.", "progress_percent")
     try:
         progress_percent = int(progress_percent)
     except (TypeError, ValueError):
+        return None, ("progress_percent는 정수여야 합니다.", "progress_percent")
+    if progress_percent < 0 or progress_percent > 100:
+        return None, ("progress_percent는 0~100 범위여야 합니다.", "progress_percent")
+
+    return (location, location_unit, progress_percent), None
+
+
+@api_view(["POST"])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated, IsActiveUser])
+def bookview_progress(request, isbn):
+    """
+    읽기 위치 저장. 위치는 progress_buffer에 모았다가 주기적으로 한 번에 반영하고 바로 응답
+    (bookview_meta는 버퍼/캐시의 최신 위치를 먼저 봄)
+    """
+    user = request.user
+
+    # 1) 책 존재 확인 (Book pk=isbn), 이 워커가 이미 history id를 알면 생략
+    history_id = progress_buffer.history_id(user.id, isbn)
+    if history_id is None and not Book.objects.filter(isbn=isbn).exists():
         return Response(
-            {"message": "progress_percent는 정수여야 합니다.", "error": {"code": "VALIDATION_ERROR", "field": "progress_percent"}},
-            status=status.HTTP_400_BAD_REQUEST,
+            {
+                "message": "도서를 찾을 수 없습니다.",
+                "error": {"code": "BOOK_NOT_FOUND"},
+            },
+            status=status.HTTP_404_NOT_FOUND,
         )
-    if progress_percent < 0 or progress_percent > 100:
+
+    # 2) 요청 값 파싱 + 유효성 검사
+    values, error = _parse_progress_fields(request.data)
+    if error:
+        message, field = error
         return Response(
-            {"message": "progress_percent는 0~100 범위여야 합니다.", "error": {"code": "VALIDATION_ERROR", "field": "progress_percent"}},
+            {"message": message, "error": {"code": "VALIDATION_ERROR", "field": field}},
             status=status.HTTP_400_BAD_REQUEST,
         )
+    location, location_unit, progress_percent = values
 
-    # 4) UserBookHistory upsert (없으면 생성, 있으면 업데이트)
-    user = request.user
-    history, created = UserBookHistory.objects.get_or_create(user=user, book=book)
+    now = timezone.now()
 
-    # 5) 저장
-    history.current_location = location
-    history.location_unit = location_unit
-    history.progress_percent = progress_percent
-    history.last_read_at = timezone.now()
-    history.save()
+    # 4) UserBookHistory 확보 (없으면 생성), 워커 메모리에 id 기억
+    if history_id is None:
+        history, _ = UserBookHistory.objects.get_or_create(
+            user=user,
+            book_id=isbn,
+            defaults={"started_at": now},
+        )
+        history_id = history.id
+        progress_buffer.remember_history(user.id, isbn, history_id)
+
+    # 5) 오늘 처음 읽은 거면 일별 읽기 수 집계 (사용자-도서-날짜당 1회, 워커별로 하루 한 번만 확인)
+    if progress_buffer.needs_daily_count(user.id, isbn, now):
+        record_daily_read(UserBookHistory(id=history_id, book_id=isbn), now)
+        progress_buffer.mark_daily_counted(user.id, isbn, now)
+
+    # 6) 분석용 이벤트 로그 (append-only 파일)
+    reading_log.append(progress_record(user.id, isbn, location, location_unit, progress_percent, now))
+
+    # 7) 버퍼에 최신 위치만 기록 (DB 반영은 PROGRESS_FLUSH_SECONDS마다 bulk_update)
+    progress_buffer.record(
+        user.id,
+        isbn,
+        ProgressEntry(
+            history_id=history_id,
+            location=location,
+            location_unit=location_unit,
+            progress_percent=progress_percent,
+            read_at=now,
+        ),
+    )
 
     return Response(
         {
             "message": "읽기 위치가 업데이트되었습니다.",
             "viewer": {
-                "isbn": book.isbn,
-                "last_location": history.current_location,
-                "location_unit": history.location_unit,
-                "progress_percent": history.progress_percent,
-                "last_read_at": history.last_read_at,
+                "isbn": isbn,
+                "last_location": location,
+                "location_unit": location_unit,
+                "progress_percent": progress_percent,
+                "last_read_at": now,
             },
         },
         status=status.HTTP_200_OK,
     )
 
 
-# --------------------------
-# Main
-# --------------------------
-def _normalize_reading_status_for_user(user, inactive_days=30, min_days_before_stop=3):
+def _batch_error(message, field, index):
+    return Response(
+        {"message": message, "error": {"code": "VALIDATION_ERROR", "field": field, "index": index}},
+        status=status.HTTP_400_BAD_REQUEST,
+    )
+
+
+@api_view(["POST"])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated, IsActiveUser])
+def bookview_progress_batch(request):
     """
-    메인 조회 시점에만 실행하는 가벼운 정리 로직(on-demand).
-    - READING인데 N일 이상 활동이 없으면 STOPPED로 전환
-    - started_at이 너무 최근이면(예: 3일 이내) STOPPED 제외(안전장치)
+    오프라인에서 쌓인 읽기 위치 일괄 동기화
+    body: {"events": [{"isbn", "location", "location_unit", "progress_percent", "client_timestamp"}, ...]}
+
+    - 도서별로 client_timestamp가 가장 늦은 이벤트만 반영 (서버에 더 늦은 위치가 있으면 유지)
+    - 한 트랜잭션에서 bulk 쿼리로 반영 (sync_progress)
+    - 미래 시각은 서버 현재 시각으로 맞춤 (기기 시계가 빠르면 이후 위치가 계속 밀리는 것 방지)
+    - EVENT_MAX_AGE보다 오래된 시각은 400 (집계/로그 보관 기간 밖)
+    - 없는 도서는 전체를 실패시키지 않고 not_found로 알려줌 (로그에도 남기지 않음)
     """
+    events = request.data.get("events")
+    if not isinstance(events, list) or not events:
+        return Response(
+            {"message": "events는 비어 있지 않은 목록이어야 합니다.", "error": {"code": "VALIDATION_ERROR", "field": "events"}},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(events) > PROGRESS_BATCH_LIMIT:
+        return Response(
+            {
+                "message": f"events는 한 번에 {PROGRESS_BATCH_LIMIT}개까지 보낼 수 있습니다.",
+                "error": {"code": "VALIDATION_ERROR", "field": "events"},
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
     now = timezone.now()
-    stop_cutoff = now - timedelta(days=inactive_days)
-    min_started_cutoff = now - timedelta(days=min_days_before_stop)
+    parsed = []
+    for index, event in enumerate(events):
+        if not isinstance(event, dict):
+            return _batch_error("이벤트 형식이 올바르지 않습니다.", "events", index)
+
+        isbn = event.get("isbn")
+        if not isbn or not isinstance(isbn, str):
+            return _batch_error("isbn은 필수입니다.", "isbn", index)
+
+        values, error = _parse_progress_fields(event)
+        if error:
+            return _batch_error(*error, index)
+        location, location_unit, progress_percent = values
+
+        raw_ts = event.get("client_timestamp")
+        try:
+            read_at = parse_datetime(raw_ts) if isinstance(raw_ts, str) else None
+        except ValueError:
+            read_at = None
+        if read_at is None:
+            return _batch_error("client_timestamp는 ISO 8601 시각이어야 합니다.", "client_timestamp", index)
+        if timezone.is_naive(read_at):
+            read_at = timezone.make_aware(read_at)
+        if read_at < now - EVENT_MAX_AGE:
+            return _batch_error(
+                f"client_timestamp는 최근 {EVENT_MAX_AGE.days}일 이내여야 합니다.", "client_timestamp", index
+            )
 
-    qs = UserBookHistory.objects.filter(user=user, status=UserBookHistory.Status.READING)
+        parsed.append((
+            isbn,
+            ProgressEntry(
+                history_id=None,
+                location=location,
+                location_unit=location_unit,
+                progress_percent=progress_percent,
+                read_at=min(read_at, now),
+            ),
+        ))
 
-    for h in qs:
-        # started_at이 너무 최근이면 중단 처리하지 않음
-        if h.started_at and h.started_at > min_started_cutoff:
-            continue
+    results = sync_progress(request.user.id, parsed, now)
 
-        # last_read_at이 있으면 last_read_at 기준, 없으면 started_at 기준
-        base_time = h.last_read_at or h.started_at
+    # 반영 여부와 관계없이 있는 도서의 이벤트는 모두 로그에 남김 (읽은 시각은 클라이언트 시각, 그 날짜 파일에 기록)
+    reading_log.append(*(
+        progress_record(request.user.id, isbn, e.location, e.location_unit, e.progress_percent, e.read_at)
+        for isbn, e in parsed
+        if isbn in results
+    ))
 
-        if base_time and base_time <= stop_cutoff:
-            h.status = UserBookHistory.Status.STOPPED
-            h.save(update_fields=["status", "updated_at"])
+    # 요청에 처음 나온 순서대로
+    isbns = list(dict.fromkeys(isbn for isbn, _ in parsed))
+    items = [
+        {
+            "isbn": isbn,
+            "applied": results[isbn][0],
+            "last_location": results[isbn][1].location,
+            "location_unit": results[isbn][1].location_unit,
+            "progress_percent": results[isbn][1].progress_percent,
+            "last_read_at": results[isbn][1].read_at,
+        }
+        for isbn in isbns
+        if isbn in results
+    ]
+    not_found = [isbn for isbn in isbns if isbn not in results]
 
+    return Response(
+        {
+            "message": "읽기 위치가 동기화되었습니다.",
+            "applied": sum(1 for item in items if item["applied"]),
+            "results": items,
+            "not_found": not_found,
+        },
+        status=status.HTTP_200_OK,
+    )
 
+
+# --------------------------
+# Main
+# --------------------------
 @api_view(["GET"])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated, IsActiveUser])
 def main_current_reading(request):
     try:
-        # 1) 오래된 READING 정리 (정합성 확보)
-        _normalize_reading_status_for_user(
-            request.user,
-            inactive_days=30,        # 정책값: 30일 미접속/미열람이면 중단 처리
-            min_days_before_stop=3,  # 안전장치: 시작한지 3일 이내는 중단 제외
-        )
+        # 1) 지금 읽는 책 선정: last_read_at 최신 1권, 동률이면 started_at (오래된 READING 제외)
+        history = current_reading_history(request.user)
 
-        # 2) 지금 읽는 책 선정: last_read_at 최신 1권, 동률이면 started_at
-        history = (
-            UserBookHistory.objects
-            .select_related("book")
-            .filter(user=request.user, status=UserBookHistory.Status.READING)
-            .order_by("-last_read_at", "-started_at", "-id")
-            .first()
-        )
-
-        # 3) 없으면 200 + null
+        # 2) 없으면 200 + null
         if history is None:
             return Response(
                 {
@@ -1277,13 +1587,45 @@ def main_current_reading(request):
 @authentication_classes([])
 @permission_classes([AllowAny])
 def main_banner(request):
-    # order 기준 정렬 + 상위 N개만 반환
-    banners = sorted(MAIN_BANNERS, key=lambda x: x.get("order", 999))[:BANNER_LIMIT]
-
     return Response(
         {
             "message": "메인 배너 조회 성공",
-            "banners": banners,
+            "banners": main_banners(),
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
+@api_view(["GET"])
+@authentication_classes([JWTAuthentication])
+@permission_classes([AllowAny])
+def main_home(request):
+    """
+    메인 화면 묶음 조회: 지금 읽는 책 + 배너 + 인기 목록(여러 종류) + 내 정보
+    - 섹션별 조회를 스레드 풀에서 동시에 실행 (build_home)
+    - 사용자와 무관한 인기 목록은 캐시, 좋아요/찜 여부만 사용자별로 덧씌움
+    - 비로그인도 가능 (내 정보/지금 읽는 책은 null)
+    - 한 섹션이 실패해도 나머지는 내려주고 errors에 섹션별 코드 표시
+    query: popular=weekly,monthly,steady (기본값, trending도 가능)
+    """
+    raw = request.GET.get("popular")
+    kinds = list(HOME_POPULAR_KINDS) if raw is None else list(dict.fromkeys(k.strip() for k in raw.split(",") if k.strip()))
+    if any(kind not in POPULAR_KINDS for kind in kinds):
+        return Response(
+            {
+                "message": "잘못된 요청입니다.",
+                "error": {"code": "INVALID_QUERY_PARAM", "field": "popular"},
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    home, errors = build_home(request.user, kinds)
+
+    return Response(
+        {
+            "message": "메인 화면 조회 성공",
+            **home,
+            "errors": errors,
         },
         status=status.HTTP_200_OK,
     )
@@ -93,6 +93,17 @@ DATABASES = {
 }
 
 
+# Cache
+# 로컬 기본값은 프로세스 메모리(locmem). 여러 워커가 공유하려면 filebased/redis 등으로 교체
+# (읽기 위치 쓰기 모음 버퍼는 공유 캐시일 때만 켜짐, PROGRESS_FLUSH_SECONDS 참고)
+CACHES = {
+    'default': {
+        'BACKEND': env("CACHE_BACKEND", default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': env("CACHE_LOCATION", default='bookspicker'),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -215,4 +226,37 @@ SIMPLE_JWT = {
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# EPUB에서 추출한 본문 텍스트 저장소 (bookview_content가 파일에서 바로 잘라 읽음)
+BOOK_TEXT_ROOT = BASE_DIR / "book_texts"
+
+# 텍스트 저장소를 쓸 수 없을 때 워커별로 파싱 결과를 보관하는 LRU 캐시 크기 (bytes)
+EPUB_TEXT_CACHE_MAX_BYTES = env.int("EPUB_TEXT_CACHE_MAX_BYTES", default=64 * 1024 * 1024)
+
+# admin 도서 등록 업로드 최대 크기 (초과분은 받는 도중 버림)
+EPUB_UPLOAD_MAX_BYTES = env.int("EPUB_UPLOAD_MAX_BYTES", default=200 * 1024 * 1024)
+COVER_UPLOAD_MAX_BYTES = env.int("COVER_UPLOAD_MAX_BYTES", default=10 * 1024 * 1024)
+
+# 인제스트 작업이 RUNNING으로 이보다 오래 남아 있으면 워커가 죽은 것으로 보고 다시 가져감 (초)
+INGEST_TASK_TIMEOUT_SECONDS = env.int("INGEST_TASK_TIMEOUT_SECONDS", default=60 * 60)
+# 같은 작업을 이만큼 가져갔는데도 또 멈췄으면 (처리 중 워커가 죽는 EPUB) 더 가져가지 않고 FAILED로
+INGEST_TASK_MAX_ATTEMPTS = env.int("INGEST_TASK_MAX_ATTEMPTS", default=3)
+
+# 도서 검색 백엔드 (SQLite: FTS5 인덱스 / 그 외 DB: api.search.IcontainsSearchBackend)
+BOOK_SEARCH_BACKEND = env("BOOK_SEARCH_BACKEND", default="api.search.SQLiteFTSSearchBackend")
+
+# 자동완성 prefix 인덱스 전체 재생성 주기 (초). 같은 프로세스의 변경은 signals로 즉시 반영
+AUTOCOMPLETE_REBUILD_SECONDS = env.int("AUTOCOMPLETE_REBUILD_SECONDS", default=600)
+
+# 검색 필터 facet 인덱스 전체 재생성 주기 (초). 같은 프로세스의 도서 변경은 signals로 즉시 반영
+FACET_REBUILD_SECONDS = env.int("FACET_REBUILD_SECONDS", default=600)
+
+# bookview_progress 쓰기 모음 주기 (초). 0이면 버퍼 없이 요청마다 바로 저장
+# 버퍼는 워커 간 최신 위치를 캐시로 맞추므로 프로세스 간 공유 캐시(CACHE_BACKEND=filebased/redis 등)가 필요.
+# 기본값 LocMemCache처럼 프로세스별 캐시면 이 값과 상관없이 요청마다 바로 저장함
+PROGRESS_FLUSH_SECONDS = env.float("PROGRESS_FLUSH_SECONDS", default=5.0)
+
+# 읽기 이벤트 로그 (날짜별 append-only 바이너리 파일, compact_reading_log로 세션 요약)
+READING_LOG_ROOT = env("READING_LOG_ROOT", default=str(BASE_DIR / "reading_logs"))
 
+# 메인 화면 묶음 조회(main/home)에서 섹션을 동시에 조회할 스레드 수 (프로세스당)
+HOME_SECTION_WORKERS = env.int("HOME_SECTION_WORKERS", default=4)